@@ -0,0 +1,212 @@
+#!/usr/bin/python
+'''
+Benchmark code2flow on the files in testscripts
+
+Every case maps some files with Mapper.map and writes the DOT file. Each run happens in a fresh process
+so that the peak RSS and the UIDs of one case do not leak into the next
+
+For every case, this records:
+	wallSeconds: mapping and writing the DOT file
+	peakRssKB: the peak resident memory of the process
+	phases: the seconds spent in each phase, as timed by code2flowlib.profiler
+		read: reading the files
+		strip: removing comments and strings
+		groups: finding the groups and nodes of every file
+		edges: finding which nodes call which
+		trim: trimming groups and extraneous nodes
+		write: generating the DOT file
+	nodes, edges: the size of the graph, to notice when the output changed
+
+Times are the best of --repeat runs. Results can be saved as JSON and compared with a baseline:
+	python benchmarks/run.py --save-baseline
+	python benchmarks/run.py --time-threshold 0.25 --rss-threshold 0.25
+
+The comparison fails (exit status 1) when a case is slower or larger than the baseline by more than the threshold
+Baselines are only comparable on the same machine so save a new one before comparing anywhere else
+'''
+
+import __builtin__
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+try:
+	import resource
+except ImportError:
+	resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TESTSCRIPTS = os.path.join(ROOT,'testscripts')
+DEFAULT_BASELINE = os.path.join(ROOT,'benchmarks','baseline.json')
+
+#name: (language,files)
+CASES = [
+	('simple.js',('js',['simple.js']))
+	,('simple2.js',('js',['simple2.js']))
+	,('superb-slideshow.js',('js',['superb-slideshow.js']))
+	,('mootools.js',('js',['mootools.js']))
+	,('jquery-1.9.1.js',('js',['jquery-1.9.1.js']))
+	,('pysimple.py',('py',['pysimple.py']))
+	,('urllib2.py',('py',['urllib2.py']))
+	,('all-js',('js',['simple.js','simple2.js','superb-slideshow.js','mootools.js','jquery-1.9.1.js']))
+	,('all-py',('py',['pysimple.py','pysimple2.py','pysimple3.py','urllib2.py']))
+	]
+
+LANGUAGES = {'js':'javascript','py':'python'}
+
+PHASES = ('read','strip','groups','edges','trim','write')
+
+def _peakRssKB():
+	if not resource:
+		return None
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	#macs report bytes and everything else reports kilobytes
+	if sys.platform == 'darwin':
+		peak //= 1024
+	return peak
+
+def runCase(name):
+	'''
+	Run one case in this process and return its measurements
+	'''
+	language, filenames = dict(CASES)[name]
+	__builtin__.DEBUG = False
+	sys.path.insert(0,ROOT)
+	from code2flowlib import engine
+	from code2flowlib.profiler import Profile
+	import code2flowlib.dotgenerator as dotgenerator
+	implementation = importlib.import_module('code2flowlib.languages.'+LANGUAGES[language])
+
+	profile = Profile()
+	engine.setProfile(profile)
+
+	#the mapper talks a lot
+	stdout = sys.stdout
+	sys.stdout = open(os.devnull,'w')
+	try:
+		start = time.time()
+		mapper = implementation.Mapper(implementation,[os.path.join(TESTSCRIPTS,filename) for filename in filenames])
+		groups, nodes, edges = mapper.map()
+
+		with profile.phase('write'):
+			dotgenerator.writeDotFile(sys.stdout,nodes,edges,groups)
+		wallSeconds = time.time()-start
+	finally:
+		sys.stdout.close()
+		sys.stdout = stdout
+
+	return {
+		'wallSeconds':wallSeconds
+		,'peakRssKB':_peakRssKB()
+		,'phases':dict((phase,profile.seconds.get(phase,0.0)) for phase in PHASES)
+		,'nodes':len(nodes)
+		,'edges':len(edges)
+		}
+
+def measureCase(name,repeat):
+	'''
+	Run a case repeat times, each in a new process, and keep the best of every measurement
+	'''
+	runs = []
+	for i in range(repeat):
+		output = subprocess.check_output([sys.executable,os.path.abspath(__file__),'--child',name])
+		runs.append(json.loads(output))
+
+	result = runs[0]
+	result['wallSeconds'] = min(run['wallSeconds'] for run in runs)
+	if result['peakRssKB'] is not None:
+		result['peakRssKB'] = min(run['peakRssKB'] for run in runs)
+	result['phases'] = dict((phase,min(run['phases'].get(phase,0.0) for run in runs)) for phase in PHASES)
+	return result
+
+def compare(results,baseline,timeThreshold,rssThreshold,minSeconds):
+	'''
+	Print how every case changed since the baseline
+	Returns the regressions
+	A case is only slower if it is slower by more than minSeconds too. Tiny cases are mostly noise
+	'''
+	regressions = []
+	print '%-22s %10s %10s %8s %10s %10s %8s'%('case','seconds','baseline','change','rss KB','baseline','change')
+	for name, result in sorted(results['cases'].items()):
+		base = baseline['cases'].get(name)
+		if not base:
+			print '%-22s %10.3f %10s'%(name,result['wallSeconds'],'-')
+			continue
+
+		timeChange = _change(result['wallSeconds'],base['wallSeconds'])
+		rssChange = _change(result['peakRssKB'],base['peakRssKB'])
+		print '%-22s %10.3f %10.3f %8s %10s %10s %8s'%(name,result['wallSeconds'],base['wallSeconds'],_formatChange(timeChange),result['peakRssKB'],base['peakRssKB'],_formatChange(rssChange))
+		print '%-22s %s'%('',' '.join('%s %.3f'%(phase,result['phases'].get(phase,0.0)) for phase in PHASES))
+
+		if timeChange is not None and timeChange > timeThreshold and result['wallSeconds']-base['wallSeconds'] > minSeconds:
+			regressions.append('%s is %s slower'%(name,_formatChange(timeChange)))
+		if rssChange is not None and rssChange > rssThreshold:
+			regressions.append('%s uses %s more memory'%(name,_formatChange(rssChange)))
+		if (result['nodes'],result['edges']) != (base['nodes'],base['edges']):
+			print '%-22s WARNING: %d nodes and %d edges. The baseline has %d nodes and %d edges'%('',result['nodes'],result['edges'],base['nodes'],base['edges'])
+	return regressions
+
+def _change(value,baseValue):
+	if value is None or not baseValue:
+		return None
+	return float(value-baseValue)/baseValue
+
+def _formatChange(change):
+	if change is None:
+		return '-'
+	return '%+.0f%%'%(change*100)
+
+if __name__ == "__main__":
+	cli = argparse.ArgumentParser(description="Benchmark code2flow on the files in testscripts and compare with a baseline")
+	cli.add_argument('cases', metavar='cases', nargs='*', help='The cases to run. Default is all of them: %s'%', '.join(name for name,case in CASES))
+	cli.add_argument('-r','--repeat', dest='repeat',type=int,default=3,help='Run every case this many times and keep the best. Default is 3')
+	cli.add_argument('-o','--out', dest='out',default=None,help='Also write the results to this JSON file')
+	cli.add_argument('-b','--baseline', dest='baseline',default=DEFAULT_BASELINE,help='The JSON file to compare with. Default is benchmarks/baseline.json')
+	cli.add_argument('--save-baseline', dest='saveBaseline',action='store_true',default=False,help='Write the results to the baseline instead of comparing with it')
+	cli.add_argument('--time-threshold', dest='timeThreshold',type=float,default=0.25,help='Fail when a case is slower than the baseline by more than this fraction. Default is 0.25')
+	cli.add_argument('--rss-threshold', dest='rssThreshold',type=float,default=0.25,help='Fail when a case uses more memory than the baseline by more than this fraction. Default is 0.25')
+	cli.add_argument('--min-seconds', dest='minSeconds',type=float,default=0.05,help='Ignore slowdowns smaller than this many seconds. Default is 0.05')
+	cli.add_argument('--child', dest='child',default=None,help=argparse.SUPPRESS)
+	args = cli.parse_args()
+
+	if args.child:
+		print json.dumps(runCase(args.child))
+		sys.exit(0)
+
+	names = args.cases or [name for name,case in CASES]
+	for name in names:
+		if name not in dict(CASES):
+			cli.error('Unknown case "%s"'%name)
+
+	results = {
+		'python':platform.python_version()
+		,'platform':platform.platform()
+		,'repeat':args.repeat
+		,'cases':{}
+		}
+	for name in names:
+		results['cases'][name] = measureCase(name,args.repeat)
+
+	for path in filter(None,[args.out,args.baseline if args.saveBaseline else None]):
+		with open(path,'w') as outfile:
+			json.dump(results,outfile,indent=1,sort_keys=True)
+			outfile.write('\n')
+
+	if args.saveBaseline or not os.path.isfile(args.baseline):
+		compare(results,{'cases':{}},args.timeThreshold,args.rssThreshold,args.minSeconds)
+		sys.exit(0)
+
+	with open(args.baseline) as infile:
+		baseline = json.load(infile)
+	regressions = compare(results,baseline,args.timeThreshold,args.rssThreshold,args.minSeconds)
+	if regressions:
+		print
+		print 'Slower or larger than the baseline:'
+		for regression in regressions:
+			print '	'+regression
+		sys.exit(1)
@@ -0,0 +1,211 @@
+'''
+Find the source files in the directories passed on the command line and read them
+
+Directories are walked recursively with scandir (os.scandir, or the scandir backport on python 2)
+and with os.listdir when neither is installed
+Excluded directories are pruned before anything in them is listed so node_modules and the like cost nothing
+
+What is excluded comes from the exclude globs and from the ignore files (.gitignore and .code2flowignore)
+found along the way. Both use the gitignore syntax:
+	blank lines and lines starting with # are skipped
+	a leading ! includes a path which an earlier pattern excluded
+	a trailing / only matches directories
+	a pattern with any other / in it is relative to the directory of the ignore file (or the walked directory)
+	otherwise, the pattern matches a file or directory with that name anywhere below
+	* and ? match anything but / and ** matches any number of directories
+
+Many files are read by threads so that slow disks and network checkouts are read in parallel
+A few files are read in this thread. Starting threads costs more than reading them
+'''
+
+import os
+import Queue
+import re
+import threading
+
+from code2flowlib.parsecache import DEFAULT_DIRECTORY
+
+try:
+	from os import scandir
+except ImportError:
+	try:
+		from scandir import scandir
+	except ImportError:
+		scandir = None
+
+DEFAULT_EXCLUDES = ('.git/','.hg/','.svn/','node_modules/','bower_components/','vendor/',DEFAULT_DIRECTORY+'/')
+IGNORE_FILENAMES = ('.gitignore','.code2flowignore')
+DEFAULT_READ_THREADS = 8
+
+#Fewer files than this are read without threads
+MIN_THREADED_READ_FILES = 32
+
+class IgnoreRule(object):
+	'''
+	One line of an ignore file or one exclude glob
+	base is the directory, relative to the walked directory and ending in a /, which the rule applies below
+	'''
+	def __init__(self,pattern,base=''):
+		self.base = base
+		self.negate = pattern.startswith('!')
+		if self.negate:
+			pattern = pattern[1:]
+		self.directoryOnly = pattern.endswith('/')
+		pattern = pattern.rstrip('/')
+		anchored = '/' in pattern
+		self.regex = re.compile(('' if anchored else '(?:.*/)?')+translateGlob(pattern.lstrip('/'))+'$')
+
+	def matches(self,path,isDirectory):
+		if self.directoryOnly and not isDirectory:
+			return False
+		if not path.startswith(self.base):
+			return False
+		return bool(self.regex.match(path[len(self.base):]))
+
+def translateGlob(glob):
+	'''
+	The regex source for a glob which is matched against a path with / separators
+	'''
+	regex = []
+	i = 0
+	while i < len(glob):
+		if glob.startswith('**/',i):
+			regex.append('(?:.*/)?')
+			i += 3
+			continue
+		if glob.startswith('**',i):
+			regex.append('.*')
+			i += 2
+			continue
+
+		character = glob[i]
+		if character == '*':
+			regex.append('[^/]*')
+		elif character == '?':
+			regex.append('[^/]')
+		elif character == '[' and ']' in glob[i+2:]:
+			end = glob.index(']',i+2)
+			characterClass = glob[i+1:end].replace('\\','\\\\')
+			if characterClass.startswith('!'):
+				characterClass = '^'+characterClass[1:]
+			regex.append('['+characterClass+']')
+			i = end
+		else:
+			regex.append(re.escape(character))
+		i += 1
+	return ''.join(regex)
+
+def parseIgnoreFile(fileString,base=''):
+	'''
+	The rules of an ignore file found in the directory base
+	'''
+	rules = []
+	for line in fileString.splitlines():
+		line = line.strip()
+		if not line or line.startswith('#'):
+			continue
+		#a leading backslash escapes a # or !
+		if line.startswith('\\'):
+			line = line[1:]
+		rules.append(IgnoreRule(line,base))
+	return rules
+
+def isIgnored(rules,path,isDirectory):
+	'''
+	Like git, the last rule which matches decides
+	'''
+	ignored = False
+	for rule in rules:
+		if rule.negate == ignored and rule.matches(path,isDirectory):
+			ignored = not rule.negate
+	return ignored
+
+def findFiles(paths,includes,excludes=DEFAULT_EXCLUDES,ignoreFilenames=IGNORE_FILENAMES):
+	'''
+	Return every file under the directories in paths which matches one of the includes and is not excluded
+	includes and excludes are globs. Paths are sorted so the same tree always gives the same list
+	'''
+	includeRules = [IgnoreRule(include) for include in includes]
+	files = []
+	for path in paths:
+		rules = [IgnoreRule(exclude) for exclude in excludes]
+		_walk(path,'',rules,includeRules,ignoreFilenames,files)
+	return files
+
+def _walk(directory,relativeDirectory,rules,includeRules,ignoreFilenames,files):
+	try:
+		entries = _listDirectory(directory)
+	except OSError as e:
+		print "Skipping %s: %s"%(directory,e)
+		return
+
+	names = set(name for name,isDirectory in entries)
+	for ignoreFilename in ignoreFilenames:
+		if ignoreFilename in names:
+			with open(os.path.join(directory,ignoreFilename)) as fi:
+				rules = rules+parseIgnoreFile(fi.read(),relativeDirectory)
+
+	for name, isDirectory in sorted(entries):
+		relativePath = relativeDirectory+name
+		if isIgnored(rules,relativePath,isDirectory):
+			continue
+		if isDirectory:
+			_walk(os.path.join(directory,name),relativePath+'/',rules,includeRules,ignoreFilenames,files)
+		elif any(rule.matches(relativePath,False) for rule in includeRules):
+			files.append(os.path.join(directory,name))
+
+def _listDirectory(directory):
+	'''
+	(name,isDirectory) for everything in the directory
+	scandir usually knows which entries are directories without a stat
+	Symlinked directories are treated as files so that the walk can not loop
+	'''
+	if scandir:
+		return [(entry.name,entry.is_dir(follow_symlinks=False)) for entry in scandir(directory)]
+	entries = []
+	for name in os.listdir(directory):
+		path = os.path.join(directory,name)
+		entries.append((name,os.path.isdir(path) and not os.path.islink(path)))
+	return entries
+
+def readFiles(filenames,threads=DEFAULT_READ_THREADS):
+	'''
+	Return the content of every file, in the same order
+
+	The threads are joined directly. multiprocessing.pool.ThreadPool is not used
+	because on python 2 closing one waits for a worker loop which sleeps 0.1s at a time
+	'''
+	if threads <= 1 or len(filenames) < MIN_THREADED_READ_FILES:
+		return map(_readFile,filenames)
+
+	fileStrings = [None]*len(filenames)
+	errors = []
+	queue = Queue.Queue()
+	for i in range(len(filenames)):
+		queue.put(i)
+
+	workers = [threading.Thread(target=_readQueuedFiles,args=(queue,filenames,fileStrings,errors)) for i in range(min(threads,len(filenames)))]
+	for worker in workers:
+		worker.start()
+	for worker in workers:
+		worker.join()
+
+	#raise the error of the first file which failed like map would
+	if errors:
+		raise min(errors)[1]
+	return fileStrings
+
+def _readQueuedFiles(queue,filenames,fileStrings,errors):
+	while True:
+		try:
+			i = queue.get_nowait()
+		except Queue.Empty:
+			return
+		try:
+			fileStrings[i] = _readFile(filenames[i])
+		except Exception as e:
+			errors.append((i,e))
+
+def _readFile(filename):
+	with open(filename) as fi:
+		return fi.read()
@@ -1,23 +1,17 @@
-def writeDotFile(dotFile,nodes,edges,groups,hidelegend=False):
-	'''
-	Write the dot file
-	'''
-	with open(dotFile,'w') as outfile:
-		outfile.write(generateDotFile(nodes,edges,groups,hidelegend))
+import errno
+import os
+import subprocess
+import threading
 
-def generateDotFile(nodes,edges,groups,hidelegend=False):
-	'''
-	Return the string for the entire dotfile
-	To be appended:
-	- A legend
-	- Nodes
-	- Edges
-	- Groups
-	'''
-	ret = "digraph G {\n"
-	ret +="concentrate = true;"
-	if not hidelegend:
-		ret += """
+from code2flowlib.profiler import timePhase
+
+#Outfiles with these extensions are written as DOT text. Every other extension is a format which dot renders
+DOT_EXTENSIONS = ('gv','dot')
+
+class RenderError(Exception):
+	pass
+
+LEGEND = """
 			subgraph legend{
 			rank = min;
 			label = "legend";
@@ -31,15 +25,130 @@ def generateDotFile(nodes,edges,groups,hidelegend=False):
 				<tr><td>Function call returns some value</td><td><font color='blue'>&#8594;</font></td></tr>
 				</table></td></tr></table>
 				>];}"""
+
+def writeDotFile(dotFile,nodes,edges,groups,hidelegend=False):
+	'''
+	Write the dot file
+	dotFile is either a filename or a file which is already open like the stdin of a dot process
+	The text is written as it is generated so the whole file is never in memory at once
+	'''
+	if hasattr(dotFile,'write'):
+		dotFile.writelines(generateDotLines(nodes,edges,groups,hidelegend))
+	else:
+		with open(dotFile,'w') as outfile:
+			outfile.writelines(generateDotLines(nodes,edges,groups,hidelegend))
+
+def renderOutfiles(outfiles,nodes,edges,groups,hidelegend=False,profile=None):
+	'''
+	Write every outfile from a single pass over the DOT text
+
+	DOT outfiles are written directly. All of the other formats are rendered by one dot process
+	which reads the DOT text from a pipe and lays the graph out once for every format e.g.
+		dot -Tsvg -oout.svg -Tpng -oout.png
+	Raises RenderError when dot can not be run or fails
+
+	With a profiler.Profile, writing is timed as the write phase and waiting for dot to finish as the render phase
+	'''
+	imageFiles = [outfile for outfile in outfiles if getOutfileFormat(outfile) not in DOT_EXTENSIONS]
+	dotFiles = [open(outfile,'w') for outfile in outfiles if outfile not in imageFiles]
+
+	process = None
+	if imageFiles:
+		command = ['dot']
+		for imageFile in imageFiles:
+			command += ['-T'+getOutfileFormat(imageFile),'-o'+imageFile]
+		try:
+			process = subprocess.Popen(command,stdin=subprocess.PIPE,stderr=subprocess.PIPE,bufsize=-1)
+		except OSError as e:
+			for dotFile in dotFiles:
+				dotFile.close()
+			raise RenderError("Could not run dot (%s). You must have graphviz (specifically dot) installed to render %s"%(e.strerror,', '.join(imageFiles)))
+
+		#Read what dot complains about while we are still writing so that neither of us blocks on a full pipe
+		errors = []
+		errorReader = threading.Thread(target=lambda: errors.append(process.stderr.read()))
+		errorReader.daemon = True
+		errorReader.start()
+
+	pipe = process.stdin if process else None
+	try:
+		with timePhase(profile,'write'):
+			for piece in generateDotLines(nodes,edges,groups,hidelegend):
+				for dotFile in dotFiles:
+					dotFile.write(piece)
+				if pipe:
+					pipe = _writeToPipe(pipe,piece)
+	finally:
+		for dotFile in dotFiles:
+			dotFile.close()
+		if pipe:
+			_closePipe(pipe)
+
+	if process:
+		with timePhase(profile,'render'):
+			returnCode = process.wait()
+			errorReader.join()
+		if returnCode != 0:
+			raise RenderError("dot failed to render %s (exit status %d)\n%s"%(', '.join(imageFiles),returnCode,''.join(errors).strip()))
+
+def _writeToPipe(pipe,piece):
+	'''
+	Returns the pipe or None once dot has stopped reading from it
+	dot exited early. What it wrote to stderr says why. The DOT files are still written in full
+	'''
+	try:
+		pipe.write(piece)
+	except IOError as e:
+		if e.errno != errno.EPIPE:
+			raise
+		_closePipe(pipe)
+		return None
+	return pipe
+
+def _closePipe(pipe):
+	try:
+		pipe.close()
+	except IOError as e:
+		if e.errno != errno.EPIPE:
+			raise
+
+def getOutfileFormat(outfile):
+	'''
+	The format of an outfile is its extension e.g. out.png is png
+	'''
+	extension = os.path.splitext(outfile)[1]
+	if not extension[1:]:
+		raise RenderError('Can not tell which format to write "%s" in. Give it an extension like .png or .gv'%outfile)
+	return extension[1:]
+
+def generateDotFile(nodes,edges,groups,hidelegend=False):
+	'''
+	Return the string for the entire dotfile
+	'''
+	return ''.join(generateDotLines(nodes,edges,groups,hidelegend))
+
+def generateDotLines(nodes,edges,groups,hidelegend=False):
+	'''
+	Yield the dotfile piece by piece
+	In order:
+	- A legend
+	- Nodes
+	- Edges
+	- Groups
+	'''
+	yield "digraph G {\n"
+	yield "concentrate = true;"
+	if not hidelegend:
+		yield LEGEND
 	for node in nodes:
-		if str(node):
-			ret += str(node)+';\n'
+		nodeString = str(node)
+		if nodeString:
+			yield nodeString+';\n'
 	for edge in edges:
-		ret += str(edge)+';\n'
-	#if False:
+		yield str(edge)+';\n'
 	for group in groups:
-		ret += str(group)+';\n'
-
-	ret += '}'
+		for piece in group.generateDot():
+			yield piece
+		yield ';\n'
 
-	return ret
\ No newline at end of file
+	yield '}'
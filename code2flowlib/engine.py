@@ -17,34 +17,216 @@ This way, we can share a lot of code between languages while still preserving fu
 Functions that begin with an "_" are not replaced by any implementation
 '''
 
-import copy
+import __builtin__
+import array
+import bisect
 import importlib
+import itertools
+import multiprocessing
 import operator
 import os
 import re
-import pdb
 import pprint
+import time
+import traceback
 
-from mutablestring import MString
+from code2flowlib.discovery import DEFAULT_READ_THREADS, readFiles
+from code2flowlib.profiler import Profile, timePhase
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
 
 #for generating UIDs for groups and nodes
 currentUID = 0
 
-def generateEdges(nodes):
+#The profiler.Profile which the phases of the run are timed and counted in. None unless we are profiling
+PROFILE = None
+
+def setProfile(profile):
+	global PROFILE
+	PROFILE = profile
+
+def countProfile(name,amount=1):
+	'''
+	Count something for the profile if we are profiling
+	For the implementations which only see the PROFILE that was there when they were imported
+	'''
+	if PROFILE:
+		PROFILE.count(name,amount)
+
+#Used to tell whether a piece of source is only whitespace without copying it
+nonWhitespacePattern = re.compile(r"\S")
+
+#Compiled patterns shared by every node and group. Nodes with the same name search for the same patterns
+#Like the cache of the re module, it is emptied when it is full so it stays bounded
+PATTERN_CACHE_SIZE = 4096
+compiledPatterns = {}
+
+def compilePattern(regex,flags=0):
+	'''
+	re.compile but each (regex,flags) is only compiled once
+	'''
+	key = (regex,flags)
+	pattern = compiledPatterns.get(key)
+	if pattern is None:
+		if len(compiledPatterns) >= PATTERN_CACHE_SIZE:
+			compiledPatterns.clear()
+		pattern = compiledPatterns[key] = re.compile(regex,flags)
+	return pattern
+
+class cachedAttribute(object):
+	'''
+	Decorates a method which computes an attribute the first time that attribute is read
+	The value is kept on the object so the method is not called again
+	_clearCachedAttributes forgets the kept values e.g. when the parent of a node changes
+	'''
+	def __init__(self,method):
+		self.method = method
+		self.__name__ = method.__name__
+		self.__doc__ = method.__doc__
+
+	def __get__(self,obj,cls):
+		if obj is None:
+			return self
+		value = obj.__dict__[self.__name__] = self.method(obj)
+		return value
+
+def _isCachedAttribute(obj,name):
+	return isinstance(getattr(type(obj),name,None),cachedAttribute)
+
+def _clearCachedAttributes(obj):
+	'''
+	Forget the cached attributes of a node or group so that they are computed again the next time they are read
+	'''
+	for name in obj.__dict__.keys():
+		if _isCachedAttribute(obj,name):
+			del obj.__dict__[name]
+
+#Every call site in a piece of source e.g. a(), a.b.c(), this.a()
+#group(1) is the namespace chain before the name including the trailing dot (e.g. 'a.b.') and group(2) is the bare name
+callSitePattern = re.compile(r"(?<![\w\.])([\w\.]*\.)?(\w+)\s*\(",re.MULTILINE)
+
+def generateCallSites(sourceString):
+	'''
+	Scan the source once and index every call site by the bare name being called
+	Each call site is a (characterPos,namespaceChain) tuple in the order they appear in the source
+	e.g. 'a.b.c()' is indexed as {'c':[(4,'a.b.')]}
+	'''
+	callSites = {}
+	for match in callSitePattern.finditer(sourceString):
+		callSites.setdefault(match.group(2),[]).append((match.start(2),match.group(1) or ''))
+	return callSites
+
+def generateEdges(nodes,jobs=1):
 	'''
 	When a function calls another function, that is an edge
 	This is in the global scope because edges can exist between any node and not just between groups
+
+	Instead of asking every node whether it links to every other node,
+	only ask about the nodes whose names appear in the call sites of the calling node
+	Edges are returned in the same order as if every pair had been checked
+
+	With more than one job, the calling nodes are split into shards which are linked in a process pool
+	The shards are merged back in order so the edges are exactly the same as linking in this process
+	'''
+	nodesByCallName = _indexNodesByCallName(nodes)
+
+	if jobs < 2 or len(nodes) < 2:
+		callers, callees = _generateLinks(nodes,nodesByCallName,range(len(nodes)))
+	else:
+		shardSize = -(-len(nodes)//(jobs*EDGE_SHARDS_PER_JOB))
+		shards = [range(start,min(start+shardSize,len(nodes))) for start in range(0,len(nodes),shardSize)]
+		pool = multiprocessing.Pool(processes=jobs,initializer=_initEdgeWorker,initargs=(nodes,nodesByCallName,DEBUG,bool(PROFILE)))
+		try:
+			shardLinks = pool.map(_generateLinksInWorker,shards,chunksize=1)
+		finally:
+			pool.close()
+			pool.join()
+		callers, callees = array.array('i'), array.array('i')
+		for callersInShard, calleesInShard, counters in shardLinks:
+			callers.extend(callersInShard)
+			callees.extend(calleesInShard)
+			if counters:
+				PROFILE.addCounters(counters)
+
+	return EdgeList(nodes,callers,callees)
+
+#When linking in a process pool, split the calling nodes into this many shards per job to even out the work
+EDGE_SHARDS_PER_JOB = 4
+
+def _indexNodesByCallName(nodes):
 	'''
-	edges = []
-	for node0 in nodes:
-		for node1 in nodes:
+	Which nodes could be called by a call site with this bare name
+	Nodes are stored with their position in the node list so that candidates can be checked in order
+	'''
+	nodesByCallName = {}
+	for i, node in enumerate(nodes):
+		for callName in node.getCallNames():
+			nodesByCallName.setdefault(callName,[]).append((i,node))
+	return nodesByCallName
+
+def _generateLinks(nodes,nodesByCallName,callerIndexes):
+	'''
+	For every calling node, find every node that it links to
+	Returns the (callers,callees) columns of node positions in the node list
+	'''
+	callers = array.array('i')
+	callees = array.array('i')
+	linksToCalls = 0
+	for callerIndex in callerIndexes:
+		node0 = nodes[callerIndex]
+		candidates = {}
+		for callName in node0.callSites:
+			for i, node1 in nodesByCallName.get(callName,()):
+				candidates[i] = node1
+
+		linksToCalls += len(candidates)
+		for i in sorted(candidates):
+			node1 = candidates[i]
 			if DEBUG:
 				print '"%s" links to "%s"?'%(node0.name,node1.name)
 			if node0.linksTo(node1):
 				if DEBUG:
 					print "Edge created"
-				edges.append(Edge(node0,node1))
-	return edges
+				callers.append(callerIndex)
+				callees.append(i)
+
+	if PROFILE:
+		PROFILE.count('linksToCalls',linksToCalls)
+	return callers, callees
+
+def _initEdgeWorker(nodes,nodesByCallName,debug,profiling):
+	'''
+	Runs once in every worker process of the edge pool
+	The nodes and lookup table are a read-only snapshot. Workers never create edges themselves
+	'''
+	global edgeWorkerNodes,edgeWorkerNodesByCallName
+	__builtin__.DEBUG = debug
+	setProfile(Profile() if profiling else None)
+	edgeWorkerNodes = nodes
+	edgeWorkerNodesByCallName = nodesByCallName
+
+def _generateLinksInWorker(callerIndexes):
+	'''
+	The counters of the profile are sent back with the links
+	'''
+	callers, callees = _generateLinks(edgeWorkerNodes,edgeWorkerNodesByCallName,callerIndexes)
+	return callers, callees, PROFILE.takeCounters() if PROFILE else None
+
+#Attributes which point to other objects and are rebuilt from the outline rather than copied into it
+OUTLINE_REFERENCES = ('source','fullSource','parent','nodes','subgroups')
+
+def _outlineAttributes(obj,uidStart):
+	'''
+	Every attribute of a group or node except for the references which the outline describes separately
+	Cached attributes are left out. They are computed again when they are read
+	The UID is stored relative to the first UID of the file
+	'''
+	attributes = dict((k,v) for k,v in obj.__dict__.items() if k not in OUTLINE_REFERENCES and not _isCachedAttribute(obj,k))
+	attributes['uid'] -= uidStart
+	return attributes
 
 class Node(object):
 	'''
@@ -55,7 +237,7 @@ class Node(object):
 	returnPattern = re.compile(r"\Wreturn\W",re.MULTILINE)
 
 
-	def __init__(self,name,definitionString,source,parent,fullSource=None,characterPos=0,lineNumber=0,isFileRoot=False): #allow default characterPos, lineNumber for implicit nodes
+	def __init__(self,name,definitionString,source,parent,fullSource=None,characterPos=0,lineNumber=0,isFileRoot=False,callSites=None,returns=None): #allow default characterPos, lineNumber for implicit nodes
 		#basic vars
 		self.name = name
 		self.definitionString = definitionString
@@ -66,16 +248,21 @@ class Node(object):
 		self.lineNumber = lineNumber #The line number the definition is on
 		self.isFileRoot = isFileRoot
 
-		#generate the name patterns for other nodes to search for this one
-		self.pattern = re.compile(r"(?:\W|\A)(%s)\s*\("%self.name,re.MULTILINE)  # The name pattern which is found by others eg. node()
-
 		self.determineNodeType() # Init node, etc.
 
-		self.sameScopePatterns = self.generateSameScopePatterns()  # The pattern to search for when the other node is in the same scope e.g. self.node()
-		self.namespacePatterns = self.generateAnyScopePatterns() # The pattern to search for with the namespace eg. Node.node()
+		#Implementations which already know the calls and returns (e.g. from a syntax tree) pass them in
+		if callSites is None:
+			#determine whether there are return statements or not
+			self.returns = bool(self.returnPattern.search(self.source.sourceBuffer))
 
-		#determine whether there are return statements or not
-		self.returns = self.returnPattern.search(self.source.sourceString)
+			#every function call made from within this node indexed by the name being called
+			self.callSites = generateCallSites(self.source.sourceBuffer)
+
+			if PROFILE:
+				PROFILE.count('regexSearches',2)
+		else:
+			self.returns = bool(returns)
+			self.callSites = callSites
 
 		#increment the identifier
 		#Needed for the sake of a unique node name for graphviz
@@ -87,18 +274,69 @@ class Node(object):
 		self.isLeaf = True #it calls nothing else
 		self.isTrunk = True #nothing calls it
 
+		#How many edges end and start at this node. Counted as the edges are created
+		self.inDegree = 0
+		self.outDegree = 0
+
+
+	#The name patterns for other nodes to search for this one and the names it is called by
+	#They are only generated when they are first needed because the namespace can change while groups are trimmed
+
+	@cachedAttribute
+	def pattern(self):
+		'''
+		The name pattern which is found by others eg. node()
+		'''
+		return compilePattern(r"(?:\W|\A)(%s)\s*\("%self.name,re.MULTILINE)
+
+	@cachedAttribute
+	def sameScopePatterns(self):
+		'''
+		The pattern to search for when the other node is in the same scope e.g. self.node()
+		'''
+		return self.generateSameScopePatterns()
+
+	@cachedAttribute
+	def namespacePatterns(self):
+		'''
+		The pattern to search for with the namespace eg. Node.node()
+		'''
+		return self.generateAnyScopePatterns()
+
+	@cachedAttribute
+	def anyScopeCalls(self):
+		return self.generateAnyScopeCalls()
 
+	@cachedAttribute
+	def namespace(self):
+		return self.getNamespace()
+
+	@cachedAttribute
+	def fullName(self):
+		return self.getFullName()
 
 	def generateSameScopePatterns(self):
-		return [re.compile(r"(?:\W|\A)%s\.%s\s*\("%(self.sameScopeKeyword,self.name),re.MULTILINE|re.DOTALL)]
+		return [compilePattern(r"(?:\W|\A)%s\.%s\s*\("%(self.sameScopeKeyword,self.name),re.MULTILINE|re.DOTALL)]
 
 	def generateAnyScopePatterns(self):
 		return [
-			re.compile(r"(?:[^a-zA-Z0-9\.]|\A)%s\s*\("%(self.getFullName()),re.MULTILINE|re.DOTALL)
+			compilePattern(r"(?:[^a-zA-Z0-9\.]|\A)%s\s*\("%(self.fullName),re.MULTILINE|re.DOTALL)
 			]
 
+	def generateAnyScopeCalls(self):
+		'''
+		The full call chains (without the parenthesis) that call this node from any scope eg. Node.node
+		'''
+		return [self.fullName]
+
 	def getNamespace(self):
-		return self.parent.getNamespace()
+		return self.parent.namespace
+
+	def getCallNames(self):
+		'''
+		The bare names which, when found at a call site, might be a call to this node
+		'''
+		return [self.name]
 
 	def determineNodeType(self):
 		'''
@@ -111,7 +349,7 @@ class Node(object):
 		'''
 		Return the name with the namespace
 		'''
-		namespace = self.getNamespace()
+		namespace = self.namespace
 		if '/' in namespace:
 			namespace = namespace.rsplit('/',1)[1]
 
@@ -123,15 +361,35 @@ class Node(object):
 	def contains(self,other):
 		return other.linksTo(self)
 
-	def isExtraneous(self,edges=None):
+	def isExtraneous(self):
 		'''
 		Dummy function meant to be subclassed
 		Will contain logic that will determine whether this node can be removed during trimming
+		Every edge has been created by then so inDegree and outDegree are final
 		'''
 		return False
 
 	def _getUID(self):
 		return 'node'+str(self.uid)
+
+	def _reparent(self,parent):
+		'''
+		Move this node into another group. The namespace changes so the cached attributes are forgotten
+		'''
+		self.parent = parent
+		_clearCachedAttributes(self)
+
+	def _generateOutline(self,uidStart):
+		'''
+		A compact, picklable description of this node which Mapper can rebuild the node from
+		The source is described by its spans rather than its text
+		'''
+		return {
+			'attributes':_outlineAttributes(self,uidStart)
+			,'source':self.source.spans
+			,'fullSource':None if self.fullSource is self.source else self.fullSource.spans
+			}
+
 	def _getFileGroup(self):
 		return self.parent._getFileGroup()
 
@@ -141,43 +399,29 @@ class Node(object):
 	def __str__(self):
 		'''
 		For printing to the DOT file
+		Trunks are coral and leaves are green
 		'''
-		attributes = {}
-
-		attributes['label']="%d: %s"%(self.lineNumber,self.getFullName())
-		attributes['shape']="rect"
-		attributes['style']="rounded"
-		#attributes['splines']='ortho'
 		if self.isTrunk:
-			attributes['style']+=',filled'
-			attributes['fillcolor']='coral'
+			style = 'style = "rounded,filled" fillcolor = "coral" '
 		elif self.isLeaf:
-			attributes['style']+=',filled'
-			attributes['fillcolor']='green'
-
-		ret = self._getUID()
-		if attributes:
-			ret += ' [splines=ortho '
-			for a in attributes:
-				ret += '%s = "%s" '%(a,attributes[a])
-			ret += ']'
+			style = 'style = "rounded,filled" fillcolor = "green" '
+		else:
+			style = 'style = "rounded" '
 
-		return ret
+		return '%s [splines=ortho shape = "rect" %slabel = "%d: %s" ]'%(self._getUID(),style,self.lineNumber,self.fullName)
 
 
 class Edge(object):
 	'''
 	Edges represent function calls
+	The graph keeps its edges in an EdgeList. Edge objects are only made to write them out
 	'''
+	__slots__ = ('node0','node1')
+
 	def __init__(self,node0,node1):
 		self.node0 = node0
 		self.node1 = node1
 
-		#When we draw the edge, we know the calling function is definitely not a leaf...
-		#and the called function is definitely not a trunk
-		node0.isLeaf = False
-		node1.isTrunk = False
-
 	def __str__(self):
 		'''
 		For printing to the DOT file
@@ -193,6 +437,53 @@ class Edge(object):
 	def hasStartNode(self,node0):
 		return node0 == self.node0
 
+class EdgeList(object):
+	'''
+	Every edge of the graph as two columns of positions in the node list
+	nodes[callers[i]] calls nodes[callees[i]]
+
+	This takes 8 bytes for each edge instead of an object for each edge
+	Iterating makes the Edge objects one at a time
+	'''
+
+	def __init__(self,nodes,callers=(),callees=()):
+		self.nodes = nodes
+		self.callers = array.array('i',callers)
+		self.callees = array.array('i',callees)
+		self._countDegrees()
+
+	def __len__(self):
+		return len(self.callers)
+
+	def __iter__(self):
+		for node0, node1 in self.pairs():
+			yield Edge(node0,node1)
+
+	def pairs(self):
+		'''
+		The (caller,callee) nodes of every edge
+		'''
+		nodes = self.nodes
+		for callerIndex, calleeIndex in itertools.izip(self.callers,self.callees):
+			yield nodes[callerIndex], nodes[calleeIndex]
+
+	def _countDegrees(self):
+		'''
+		Count how many edges start and end at every node
+		When we draw the edge, we know the calling function is definitely not a leaf...
+		and the called function is definitely not a trunk
+		Counted rather than flagged so that trimming does not have to look through the edges again
+		'''
+		outDegrees = [0]*len(self.nodes)
+		inDegrees = [0]*len(self.nodes)
+		for callerIndex in self.callers:
+			outDegrees[callerIndex] += 1
+		for calleeIndex in self.callees:
+			inDegrees[calleeIndex] += 1
+		for node, outDegree, inDegree in itertools.izip(self.nodes,outDegrees,inDegrees):
+			node.outDegree = outDegree
+			node.inDegree = inDegree
+
 class Group(object):
 	'''
 	Groups represent namespaces
@@ -209,12 +500,6 @@ class Group(object):
 		self.nodes = []
 		self.subgroups = []
 
-		#So that we can track object calls as well like:
-		# a = Obj()
-		# a.b()
-		self.newObjectPattern = self.generateNewObjectPattern()
-		self.newObjectAssignedPattern = self.generateNewObjectAssignedPattern()
-
 		#increment the identifier
 		#Needed for the sake of a unique node name for graphviz
 		global currentUID
@@ -225,25 +510,45 @@ class Group(object):
 		'''
 		__str__ is for printing to the DOT file
 		'''
-		#pdb.set_trace()
-		ret = 'subgraph '+self._getUID()
-		ret += '{\n'
+		return ''.join(self.generateDot())
+
+	def generateDot(self):
+		'''
+		Yield the DOT text of this group piece by piece so that it can be written without building it all first
+		Subgroups are nested clusters
+		'''
+		yield 'subgraph '+self._getUID()+'{\n'
 		if self.nodes:
 			for node in self.nodes:
-				ret += node._getUID() + ' '
+				yield node._getUID() + ' '
 				#if node.isFileRoot:
-				#	ret += ";{rank=source; %s}"%node._getUID()
-
-			ret += ';\n'
-		ret += 'label="%s";\n'%self.name;
-		ret += 'style=filled;\n';
-		ret += 'color=black;\n';
-		ret += 'graph[style=dotted];\n'
-		#pdb.set_trace()
+				#	yield ";{rank=source; %s}"%node._getUID()
+
+			yield ';\n'
+		yield 'label="%s";\n'%self.name
+		yield 'style=filled;\n'
+		yield 'color=black;\n'
+		yield 'graph[style=dotted];\n'
 		for subgroup in self.subgroups:
-			ret += str(subgroup)
-		ret += '}'
-		return ret
+			for piece in subgroup.generateDot():
+				yield piece
+		yield '}'
+
+	#So that we can track object calls as well like:
+	# a = Obj()
+	# a.b()
+
+	@cachedAttribute
+	def newObjectPattern(self):
+		return self.generateNewObjectPattern()
+
+	@cachedAttribute
+	def newObjectAssignedPattern(self):
+		return self.generateNewObjectAssignedPattern()
+
+	@cachedAttribute
+	def namespace(self):
+		return self.getNamespace()
 
 	def getNamespace(self):
 		'''
@@ -289,6 +594,33 @@ class Group(object):
 		except:
 			return 'cluster'+re.sub(r"[/\.\-\(\)=\s]",'',self.name)+str(self.uid)
 
+	def _reparent(self,parent):
+		'''
+		Move this group into another group
+		The namespace of everything inside of this group changes so their cached attributes are forgotten
+		'''
+		self.parent = parent
+		self._clearCachedAttributes()
+
+	def _clearCachedAttributes(self):
+		_clearCachedAttributes(self)
+		for node in self.nodes:
+			_clearCachedAttributes(node)
+		for subgroup in self.subgroups:
+			subgroup._clearCachedAttributes()
+
+	def _generateOutline(self,uidStart):
+		'''
+		A compact, picklable description of this group, its nodes, and its subgroups
+		'''
+		return {
+			'attributes':_outlineAttributes(self,uidStart)
+			,'source':self.source.spans
+			,'fullSource':None if self.fullSource is self.source else self.fullSource.spans
+			,'nodes':[node._generateOutline(uidStart) for node in self.nodes]
+			,'subgroups':[subgroup._generateOutline(uidStart) for subgroup in self.subgroups]
+			}
+
 	def _allNodes(self):
 		'''
 		Every node in this namespace and all descendent namespaces
@@ -308,18 +640,133 @@ class Group(object):
 		return self._getFileGroup().name
 
 
+class LineIndex(object):
+	'''
+	Where every line of the cleaned file source begins (lineStarts)
+	and which line of the original file that is (lineNumbers). They are not the same because
+	comments and strings which span lines are removed
+
+	Built once per file and shared by every piece of sourcecode cut from that file
+	'''
+	def __init__(self,lineStarts=(0,),lineNumbers=(1,)):
+		self.lineStarts = array.array('l',lineStarts)
+		self.lineNumbers = array.array('l',lineNumbers)
+
+	def append(self,lineStart,lineNumber):
+		self.lineStarts.append(lineStart)
+		self.lineNumbers.append(lineNumber)
+
+	def getLineNumber(self,filePosition):
+		'''
+		The line number of the character at filePosition in the cleaned file source
+		'''
+		return self.lineNumbers[bisect.bisect_right(self.lineStarts,filePosition)-1]
+
+class BracketTable(object):
+	'''
+	Where the matching close bracket of every open bracket in the cleaned file source is
+
+	Built on first use and shared by every piece of sourcecode cut from that file
+	Implementations which already know where the brackets are (like the javascript token stream) override _findBrackets
+	An open bracket which is never closed is not in the table
+	'''
+	def __init__(self,fileString,openBracket,closeBracket):
+		self.fileString = fileString
+		self.openBracket = openBracket
+		self.closeBracket = closeBracket
+		self.closePositions = None
+
+	def getClosePosition(self,openPosition):
+		'''
+		Position in the cleaned file source of the bracket which closes the one at openPosition. -1 if there is none
+		'''
+		if self.closePositions is None:
+			self.closePositions = matchBrackets(*self._findBrackets())
+		return self.closePositions.get(openPosition,-1)
+
+	def _findBrackets(self):
+		'''
+		The sorted positions of every open bracket and every close bracket
+		'''
+		if numpy:
+			characters = numpy.frombuffer(self.fileString,dtype=numpy.uint8)
+			return numpy.flatnonzero(characters == ord(self.openBracket)), numpy.flatnonzero(characters == ord(self.closeBracket))
+		openPositions = [match.start() for match in re.finditer(re.escape(self.openBracket),self.fileString)]
+		closePositions = [match.start() for match in re.finditer(re.escape(self.closeBracket),self.fileString)]
+		return openPositions, closePositions
+
+def matchBrackets(openPositions,closePositions):
+	'''
+	Which close bracket closes every open bracket. Both are sorted positions in the same file
+	Returns {openPosition:closePosition}
+	A close bracket with nothing open is ignored just like it is when counting forward from an open bracket
+	Uses numpy when it is installed and a plain stack otherwise
+	'''
+	if numpy:
+		return _matchBracketsWithNumpy(openPositions,closePositions)
+	return _matchBracketsWithStack(openPositions,closePositions)
+
+def _matchBracketsWithStack(openPositions,closePositions):
+	'''
+	Walk both in order keeping a stack of the open brackets
+	'''
+	matches = {}
+	stack = []
+	i = 0
+	for closePosition in closePositions:
+		while i < len(openPositions) and openPositions[i] < closePosition:
+			stack.append(openPositions[i])
+			i += 1
+		if stack:
+			matches[stack.pop()] = closePosition
+	return matches
+
+def _matchBracketsWithNumpy(openPositions,closePositions):
+	'''
+	The same table from the cumulative nesting depth
+
+	Every bracket gets the depth of the pair it belongs to (the depth after an open bracket and before a close bracket)
+	Between an open bracket and its close, the depth never drops below that of the pair
+	So sorted by depth and then position, an open bracket is matched by the close bracket right after it
+	'''
+	openPositions = numpy.asarray(openPositions,dtype=numpy.intp)
+	closePositions = numpy.asarray(closePositions,dtype=numpy.intp)
+	positions = numpy.concatenate((openPositions,closePositions))
+	order = numpy.argsort(positions,kind='mergesort')
+	positions = positions[order]
+	isOpen = order < len(openPositions)
+
+	depths = numpy.cumsum(numpy.where(isOpen,1,-1))
+	depths[~isOpen] += 1
+
+	order = numpy.lexsort((positions,depths))
+	sortedIsOpen = isOpen[order]
+	sortedDepths = depths[order]
+	isPair = sortedIsOpen[:-1] & ~sortedIsOpen[1:] & (sortedDepths[:-1] == sortedDepths[1:])
+
+	matchedOpens = positions[order[:-1][isPair]]
+	matchedCloses = positions[order[1:][isPair]]
+	return dict(zip(matchedOpens.tolist(),matchedCloses.tolist()))
+
 class SourceCode(object):
 	'''
 	SourceCode is a convenient object object representing:
 		source text (sourceString)
-		a line number array (characterToLineMap)
+		where the text came from in the cleaned file source (spans)
+		where the lines of the cleaned file source begin (lineIndex) which is shared by every piece of the file
+		where the brackets of the cleaned file source close (bracketTable) which is also shared
+
+	A sourcecode object is a view. Every piece of a file shares the cleaned file source (fileString)
+	and only the spans are its own. The text (sourceString) is only materialized when it is asked for.
+	Regexes and character lookups should use sourceBuffer which, for a single span, is a zero-copy buffer of the file
 
 	A sourcecode object is maintained internally in both the Group and Node and classes
 
-	Implementations will probably only have to overwrite the two properties:
+	Implementations will probably only have to overwrite the properties:
 		blockComments
-		strings
-	Although Python does overwrite more because of it's indent system
+		inlineComments
+		delimA and delimB, the brackets which blocks are between
+	Python does not find its blocks between brackets. They come from its indentation (see python.generateBlockOutline)
 
 	The sourcecode object supports the following primitive operations
 		sc = SourceCode()
@@ -327,12 +774,15 @@ class SourceCode(object):
 		sc[a:b] #betweenCharacters
 		sc[a] #character
 		scA + scB #addition as long as line numbers do not overlap
-		scA - scB #subtraction as long as scB is completely inside scA
+		scA - scB #subtraction. Whatever of scB is inside scA is taken out
 		sc == True #truth testing (empty string)
+		sc.sourceString #the text. Materialized on first use
+		sc.sourceBuffer #the text without copying it when possible. For regexes and character lookups
 		str(sc) print with line numbers
 
 	And these are the methods
-		copy() #deepcopy
+		copy() #new sourcecode sharing the same lineIndex
+		subtract(sources) #new sourcecode with all of the sources taken out
 		firstLineNumber() #of the entire object
 		lastLineNumber()  #of the entire object
 		remove(string) #and return new sourcecode
@@ -340,8 +790,8 @@ class SourceCode(object):
 		getPosition(lineNumber) #get character index at linenumber
 		getLineNumber(characterPos) #get line number of character
 		find(what,start) #run sourceString.find()
+		rfind(what) #run sourceString.rfind()
 		extractBetweenDelimiters(a,b,startAt) #return new sourcecode between the first pair of delimiters after startAt
-		getSourceInBlock(bracketPos) #Return the source to the matching bracket
 		matchingBracketPos(bracketPos) #Return the matching bracket position
 		endDelimPos(startAt,a,b) #return the position of the nearest end bracket given a position in the block
 		openDelimPos(startAt) #return the position of the nearest begin bracket given a position in the block
@@ -355,42 +805,75 @@ class SourceCode(object):
 	delimA='{'
 	delimB='}'
 
-	def __init__(self,sourceString,characterToLineMap=None):
+	def __init__(self,fileString,lineIndex=None,spans=None,bracketTable=None):
 		'''
-		Remove the comments and build the linenumber/file mapping while doing so
+		Without a lineIndex, fileString is the raw file. Remove the comments and build the line index while doing so
+		With a lineIndex, fileString is the already cleaned file source
+
+		spans is the list of (start,end) character ranges of the cleaned file source which,
+		joined together, make up this sourceString. They are kept up to date through slicing and adding
+		so that any piece of source can be described without copying its text
+		There is always at least one span, even if it is empty, so that every piece of source has a line number
+
+		bracketTable is passed along the same way as the lineIndex. It is built the first time a bracket is matched
 		'''
-		self.sourceString = sourceString
+		self.fileString = fileString
 
-		if characterToLineMap:
-			self.characterToLineMap = characterToLineMap
+		if lineIndex:
+			self.lineIndex = lineIndex
 		else:
-			self.characterToLineMap = {}
+			self.lineIndex = LineIndex()
 
 			self._removeCommentsAndStrings()
-			self.sourceString = str(self.sourceString) #convert back to regular python string from mutable string
+			self.fileString = str(self.fileString) #convert back to regular python string from mutable string
 
 			if DEBUG:
 				#print 'REMOVED COMMENTS',self
 				with open('cleanedSource','w') as outfile:
-					outfile.write(self.sourceString)
+					outfile.write(self.fileString)
+
+		if spans is None:
+			spans = [(0,len(self.fileString))]
+		self.spans = spans
+		self.length = sum(spanEnd-spanStart for spanStart,spanEnd in spans)
+		self._sourceString = None
 
 		self.delimLen = len(self.delimA)
+		self.bracketTable = bracketTable or BracketTable(self.fileString,self.delimA,self.delimB)
 
-	def __len__(self):
-		return len(self.sourceString)
+	@property
+	def sourceString(self):
+		'''
+		The text of this source. Only materialized (and then kept) when something asks for it
+		'''
+		if self._sourceString is None:
+			if self.spans == [(0,len(self.fileString))]:
+				self._sourceString = self.fileString
+			else:
+				self._sourceString = ''.join(self.fileString[spanStart:spanEnd] for spanStart,spanEnd in self.spans)
+		return self._sourceString
 
-	def __getitem__(self,sl):
+	@property
+	def sourceBuffer(self):
+		'''
+		The text of this source for regexes and character lookups
+		When this source is a single span of the file, this is a buffer over the file and nothing is copied
 		'''
-		If sliced, return a new object with the sourceString and the characterToLineMap sliced by [firstChar:lastChar]
+		if self._sourceString is None and len(self.spans) == 1:
+			spanStart,spanEnd = self.spans[0]
+			return buffer(self.fileString,spanStart,spanEnd-spanStart)
+		return self.sourceString
 
-		1. Slice the source string in the obvious way.
-		2. Slice the charactertolinemap
-			a. Remove character mappings that are not in between where we are shifting to
-			b. Take remaining characterPositions and shift them over by start shift
+	def __len__(self):
+		return self.length
 
+	def __getitem__(self,sl):
+		'''
+		If sliced, return a new object with the sourceString and the spans sliced by [firstChar:lastChar]
+		The line index is shared so nothing else has to be copied or shifted
 		'''
 		if type(sl) == int:
-			return self.sourceString[sl]
+			return self.sourceBuffer[sl]
 
 		if type(sl) != slice:
 			raise Exception("Slice was not passed")
@@ -404,38 +887,20 @@ class SourceCode(object):
 			start = sl.start
 
 		if sl.stop is None:
-			stop = len(self.sourceString)
+			stop = self.length
 		elif sl.stop < 0:
-			stop = len(self.sourceString)+sl.stop
+			stop = self.length+sl.stop
 		else:
-			stop = sl.stop
+			stop = min(sl.stop,self.length)
 
 		if start>stop:
 			raise Exception("Begin slice cannot be greater than end slice. You passed SourceCode[%d:%d]"%(sl.start,sl.stop))
 
-		ret = self.copy()
-
-		ret.sourceString = ret.sourceString[start:stop]
-
-		#filter out character mapping we won't be using
-		shiftedCharacterToLineMap = {}
-		characterPositions = ret.characterToLineMap.keys()
-		characterPositions = filter(lambda p: p>=start and p<=stop,characterPositions)
-
-		#shift existing character mappings to reflect the new start position
-		#If we start with 0, no shifting will take place
-		for characterPosition in characterPositions:
-			shiftedCharacterToLineMap[characterPosition-start] = ret.characterToLineMap[characterPosition]
-
-		#we need this to be sure that we can always get the line number no matter where we splice
-		shiftedCharacterToLineMap[0] = self.getLineNumber(start)
-
-		ret.characterToLineMap = shiftedCharacterToLineMap
-		return ret
+		return self._fromSpans(self._sliceSpans(start,stop))
 
 	def __add__(self,other):
 		'''
-		Add two pieces of sourcecode together shifting the character to line map appropriately
+		Add two pieces of sourcecode together joining their spans
 		'''
 
 		#If one operand is nothing, just return the value of this operand
@@ -445,80 +910,108 @@ class SourceCode(object):
 		if self.lastLineNumber()>other.firstLineNumber():
 			raise Exception("When adding two pieces of sourcecode, the second piece must be completely after the first as far as line numbers go")
 
-		sourceString = self.sourceString + other.sourceString
-
-		shiftedCharacterToLineMap = {}
-		characterPositions = other.characterToLineMap.keys()
-		for characterPosition in characterPositions:
-			shiftedCharacterToLineMap[characterPosition+len(self.sourceString)] = other.characterToLineMap[characterPosition]
-
-		characterToLineMap = dict(self.characterToLineMap.items() + shiftedCharacterToLineMap.items())
-
-		ret = SourceCode(sourceString=sourceString,characterToLineMap=characterToLineMap)
+		#drop empty spans and join spans which meet
+		spans = []
+		for span in self.spans+other.spans:
+			if span[0] == span[1]:
+				continue
+			if spans and spans[-1][1] == span[0]:
+				spans[-1] = (spans[-1][0],span[1])
+			else:
+				spans.append(span)
+		if not spans:
+			spans = [other.spans[0]]
 
-		return ret
+		return self._fromSpans(spans)
 
 	def __sub__(self,other):
-		if not other:
-			return self.copy()
-
-		if self.firstLineNumber()>other.firstLineNumber() or self.lastLineNumber()<other.lastLineNumber():
-			pdb.set_trace()
-			raise Exception("When subtracting a piece of one bit of sourcecode from another, the second must lie completely within the first")
-
-		firstPos = self.sourceString.find(other.sourceString)
-
-		if firstPos == -1:
-			pdb.set_trace()
-			raise Exception('Could not subtract string starting with "%s" from source because string could not be found'%other.sourceString[:50].replace("\n","\\n"))
-
-		lastPos = firstPos + len(other.sourceString)
+		return self.subtract([other])
 
+	def subtract(self,sources):
+		'''
+		Return what is left of this source after taking out every one of the sources
+		Works on the spans in one pass so nothing is searched for or copied. The sources may overlap and be in any order
+		Anything in the sources which is not part of this source is ignored
+		'''
+		#the spans to take out, sorted and with overlapping spans joined
+		removedSpans = []
+		for removedStart,removedEnd in sorted(span for source in sources for span in source.spans):
+			if removedStart == removedEnd:
+				continue
+			if removedSpans and removedStart <= removedSpans[-1][1]:
+				removedSpans[-1][1] = max(removedSpans[-1][1],removedEnd)
+			else:
+				removedSpans.append([removedStart,removedEnd])
+
+		#walk both lists of spans together keeping the parts of ours which are not removed
+		keptSpans = []
+		i = 0
+		for spanStart,spanEnd in self.spans:
+			pos = spanStart
+			while i < len(removedSpans) and removedSpans[i][1] <= pos:
+				i += 1
+			while i < len(removedSpans) and removedSpans[i][0] < spanEnd:
+				removedStart,removedEnd = removedSpans[i]
+				keptSpans.append((pos,removedStart))
+				pos = max(pos,removedEnd)
+				if removedEnd > spanEnd:
+					break
+				i += 1
+			keptSpans.append((pos,spanEnd))
+
+		#drop empty spans and join spans which meet
+		spans = []
+		for spanStart,spanEnd in keptSpans:
+			if spanStart >= spanEnd:
+				continue
+			if spans and spans[-1][1] == spanStart:
+				spans[-1] = (spans[-1][0],spanEnd)
+			else:
+				spans.append((spanStart,spanEnd))
 
-		firstPart = self[:firstPos]
-
-		secondPart = self[lastPos:]
+		#there is always at least one span
+		if not spans:
+			spans = [(self.spans[0][0],self.spans[0][0])]
 
-		return firstPart+secondPart
+		return self._fromSpans(spans)
 
 	def __nonzero__(self):
 		'''
 		__nonzero__ is object evaluates to True or False
 		sourceString will be False when the sourceString has nothing or nothing but whitespace
 		'''
-		return self.sourceString.strip()!=''
+		for spanStart,spanEnd in self.spans:
+			if nonWhitespacePattern.search(self.fileString,spanStart,spanEnd):
+				return True
+		return False
 
 	def __str__(self):
 		'''
 		Mostly for debugging. Print the source with line numbers
 		'''
 		ret = ''
+		lineStarts = dict(self._lineStarts())
 		for i, char in enumerate(self.sourceString):
-			if i in self.characterToLineMap:
-				ret += '%d: '%self.characterToLineMap[i]
+			if i in lineStarts:
+				ret += '%d: '%lineStarts[i]
 			ret += char
 		return ret
 
 	def copy(self):
-		return copy.deepcopy(self)
+		return self._fromSpans(self.spans)
 
 	def firstLineNumber(self):
 		'''
 		First line number of the entire source
 		'''
-		try:
-			return min(self.characterToLineMap.values())
-		except ValueError:
-			raise Exception("Sourcecode has no line numbers")
+		return self.lineIndex.getLineNumber(self.spans[0][0])
 
 	def lastLineNumber(self):
 		'''
 		Last line number of the entire source
+		A line which begins right at the end of the source counts
 		'''
-		try:
-			return max(self.characterToLineMap.values())
-		except ValueError:
-			raise Exception("Sourcecode has no line numbers")
+		return self.lineIndex.getLineNumber(self.spans[-1][1])
 
 	def remove(self,stringToRemove):
 		'''
@@ -526,7 +1019,6 @@ class SourceCode(object):
 		'''
 		firstPos = self.sourceString.find(stringToRemove)
 		if firstPos == -1:
-			pdb.set_trace()
 			raise Exception("String not found in source")
 		lastPos = firstPos + len(stringToRemove)
 		return self[:firstPos]+self[lastPos:]
@@ -545,7 +1037,7 @@ class SourceCode(object):
 		'''
 		From lineNumber, get the character position
 		'''
-		for pos,lineNumber in self.characterToLineMap.items():
+		for pos,lineNumber in self._lineStarts():
 			if lineNumber == lineNumberRequest:
 				return pos
 
@@ -553,28 +1045,39 @@ class SourceCode(object):
 
 	def getLineNumber(self,pos):
 		'''
-		Decrement until we find the first character of the line and can get the linenumber
+		Find where pos is in the cleaned file source and look up the line it is on
 		'''
-		while True:
-			try:
-				return self.characterToLineMap[pos]
-			except:
-				pos-=1
-				if pos < 0:
-					raise Exception("could not get line number for position %d"%pos)
+		if pos < 0:
+			raise Exception("could not get line number for position %d"%pos)
+		return self.lineIndex.getLineNumber(self._getFilePosition(min(pos,self.length)))
 
 	def find(self,what,start=0):
 		'''
 		Pass through 'find' makes implementations cleaner
+		Searches the file directly when this source is a single span
 		'''
+		if self._sourceString is None and len(self.spans) == 1:
+			spanStart,spanEnd = self.spans[0]
+			pos = self.fileString.find(what,spanStart+start,spanEnd)
+			return pos-spanStart if pos != -1 else -1
 		return self.sourceString.find(what,start)
 
+	def rfind(self,what):
+		'''
+		Pass through 'rfind'. Searches the file directly when this source is a single span
+		'''
+		if self._sourceString is None and len(self.spans) == 1:
+			spanStart,spanEnd = self.spans[0]
+			pos = self.fileString.rfind(what,spanStart,spanEnd)
+			return pos-spanStart if pos != -1 else -1
+		return self.sourceString.rfind(what)
+
 	def extractBetweenDelimiters(self,startAt=0):
 		'''
 		Return the source between the first pair of delimiters after 'startAt'
 		'''
 
-		start = self.sourceString.find(self.delimA,startAt)
+		start = self.find(self.delimA,startAt)
 		if start == -1:
 			return None
 		start += self.delimLen
@@ -585,22 +1088,6 @@ class SourceCode(object):
 		else:
 			return None
 
-	def getSourceInBlock(self,bracketPos):
-		'''
-		Get the source within two matching brackets
-		'''
-		otherBracketPosition = self.matchingBracketPos(bracketPos)
-
-		if bracketPos < otherBracketPosition:
-			startBracketPos = bracketPos
-			endBracketPos = otherBracketPosition
-		else:
-			startBracketPos = otherBracketPosition
-			endBracketPos = bracketPos
-
-		ret = self[startBracketPos+1:endBracketPos]
-		return ret
-
 	def matchingBracketPos(self,bracketPos):
 		'''
 		Find the matching bracket position
@@ -608,12 +1095,9 @@ class SourceCode(object):
 
 		delim = self[bracketPos]
 		if delim == self.delimA:
-			if self.sourceString[bracketPos+1]==self.delimB:
-				return bracketPos + 1
-			else:
-				return self.endDelimPos(startAt=bracketPos+1)
+			return self._closeDelimPos(bracketPos)
 		elif delim == self.delimB:
-			if self.sourceString[bracketPos-1]==self.delimA:
+			if self[bracketPos-1]==self.delimA:
 				return bracketPos - 1
 			else:
 				return self.openDelimPos(startAt=bracketPos-1)
@@ -625,10 +1109,11 @@ class SourceCode(object):
 		Find the nearest end delimiter assuming that 'startAt' is inside of a block
 		'''
 
+		sourceBuffer = self.sourceBuffer
 		count = 1
 		i = startAt
-		while i<len(self.sourceString) and count>0:
-			tmp = self.sourceString[i:i+self.delimLen]
+		while i<len(sourceBuffer) and count>0:
+			tmp = sourceBuffer[i:i+self.delimLen]
 			if tmp==self.delimA:
 				count += 1
 				i+=self.delimLen
@@ -643,6 +1128,22 @@ class SourceCode(object):
 		else:
 			return -1
 
+	def _closeDelimPos(self,bracketPos):
+		'''
+		Find the end delimiter matching the begin delimiter at bracketPos or -1 if it is not closed within this source
+		A single span of single character delimiters is looked up in the bracket table. Anything else walks forward
+		'''
+		if len(self.spans) == 1 and self.delimLen == 1:
+			spanStart,spanEnd = self.spans[0]
+			closePos = self.bracketTable.getClosePosition(spanStart+bracketPos)
+			if closePos != -1 and closePos < spanEnd:
+				return closePos-spanStart
+			return -1
+
+		if self[bracketPos+1]==self.delimB:
+			return bracketPos + 1
+		return self.endDelimPos(startAt=bracketPos+1)
+
 	def openDelimPos(self,pos):
 		'''
 		Find the nearest begin delimiter assuming that 'pos' is inside of a block
@@ -650,12 +1151,13 @@ class SourceCode(object):
 		TODO this should probably just be the same function as endDelimPos
 		'''
 
+		sourceBuffer = self.sourceBuffer
 		count = 0
 		i = pos
 		while i>=0 and count>=0:
-			if self.sourceString[i] in ('}',')'):
+			if sourceBuffer[i] in ('}',')'):
 				count += 1
-			elif self.sourceString[i] in ('{','('):
+			elif sourceBuffer[i] in ('{','('):
 				count -= 1
 			i-=1
 
@@ -664,95 +1166,289 @@ class SourceCode(object):
 		else:
 			return 0
 
+	def _sliceSpans(self,start,stop):
+		'''
+		Return the spans of the cleaned file source which make up sourceString[start:stop]
+		'''
+		spans = []
+		offset = 0
+		for spanStart,spanEnd in self.spans:
+			spanLen = spanEnd-spanStart
+			sliceStart = max(start-offset,0)
+			sliceStop = min(stop-offset,spanLen)
+			if sliceStart < sliceStop:
+				spans.append((spanStart+sliceStart,spanStart+sliceStop))
+			offset += spanLen
+			if offset >= stop:
+				break
+
+		if not spans:
+			filePosition = self._getFilePosition(min(start,self.length))
+			spans.append((filePosition,filePosition))
+		return spans
+
+	def _getFilePosition(self,pos):
+		'''
+		Position in the cleaned file source of the character at pos
+		The end of a span counts as the beginning of the next one
+		'''
+		offset = 0
+		for spanStart,spanEnd in self.spans:
+			if pos < offset+spanEnd-spanStart:
+				break
+			offset += spanEnd-spanStart
+		else:
+			return self.spans[-1][1]
+		return spanStart+pos-offset
+
+	def _lineStarts(self):
+		'''
+		Yield (pos,lineNumber) for the start of this source and every line which begins inside of it
+		'''
+		yield 0,self.firstLineNumber()
+		offset = 0
+		for spanStart,spanEnd in self.spans:
+			i = bisect.bisect_right(self.lineIndex.lineStarts,spanStart)
+			if offset:
+				yield offset,self.lineIndex.getLineNumber(spanStart)
+			while i < len(self.lineIndex.lineStarts) and self.lineIndex.lineStarts[i] <= spanEnd:
+				yield offset+self.lineIndex.lineStarts[i]-spanStart,self.lineIndex.lineNumbers[i]
+				i += 1
+			offset += spanEnd-spanStart
+
+	def _fromSpans(self,spans):
+		'''
+		A new piece of this file's source made of spans. Shares everything else with this piece
+		'''
+		return self.__class__(self.fileString,lineIndex=self.lineIndex,spans=list(spans),bracketTable=self.bracketTable)
+
+	def _getLexerPattern(self):
+		'''
+		One regex which finds the start of the next comment or string of any kind
+		Each kind is a named group, blockComment0..n in the order of blockComments and then inlineComment
+		Because alternatives are tried in order, a block comment listed first wins just like checking them one by one would
+		Compiled once per language
+		'''
+		cls = self.__class__
+		if '_lexerPattern' not in cls.__dict__:
+			alternatives = []
+			for i, blockComment in enumerate(self.blockComments):
+				if type(blockComment['start']) == str:
+					start = re.escape(blockComment['start'])
+				else:
+					start = blockComment['start'].pattern
+				alternatives.append('(?P<blockComment%d>%s)'%(i,start))
+			if self.inlineComments:
+				alternatives.append('(?P<inlineComment>%s)'%re.escape(self.inlineComments))
+			cls._lexerPattern = re.compile('|'.join(alternatives))
+		return cls._lexerPattern
+
 	def _removeCommentsAndStrings(self):
 		'''
 
 		Two things happen here:
-		a. Character by character, add those characters which are not part of comments or strings to a new string
-		   Same the new string as the 'sourceString' variable
-		b. At the same time, generate an array of line number beginnings called the 'characterToLineMap'
+		a. Add the runs of code which are not part of comments or strings to a new string
+		   Same the new string as the 'fileString' variable
+		b. At the same time, generate the line index of where every line begins
+
+		The lexer pattern jumps straight to the next comment or string so that everything in between
+		is copied as one run. Line starts within a run are found with str.find
 
-		This uses a mutable string to save time on adding
+		Strings keep their delimiters but lose their contents (e.g. "abc" becomes "")
+		Regex blockComments and inline comments are removed entirely
+		If a comment or string never ends, the rest of the file is dropped
 
 		'''
 		print "Removing comments and strings..."
 
-		originalString = str(self.sourceString)
-		self.sourceString = MString('')
-		self.characterToLineMap = {}
-		lineCount = 1
-		self.characterToLineMap[0] = lineCount #character 0 is line #1
-		lineCount += 1 #set up for next line which will be two
-		#pdb.set_trace()
-		i=0
-
+		originalString = str(self.fileString)
+		lexerPattern = self._getLexerPattern()
 		inlineCommentLen = len(self.inlineComments)
 
-		#begin analyzing charactes 1 by 1 until we reach the end of the originalString
-		#-blockCommentLen so that we don't go out of bounds
-		while i < len(originalString):
-			#check if the next characters are a block comment
-			#There are multiple types of block comments so we have to check them all
-			for blockComment in self.blockComments:
-				if type(blockComment['start']) == str:
-					blockCommentLen = len(blockComment['start'])
-					if originalString[i:][:blockCommentLen] == blockComment['start']:
-						#if it was a block comment, jog forward
-						prevI = i
-						i = originalString.find(blockComment['end'],i+blockCommentLen)+blockCommentLen
+		runs = []
+		cleanedLen = 0
+		self.lineIndex = LineIndex() #character 0 is line #1
+		lineCount = 2 #set up for next line which will be two
+		i = 0
+		searches = 0
 
-						while originalString[i-1]=='\\':
-							i = originalString.find(blockComment['end'],i+blockCommentLen)+blockCommentLen
+		while True:
+			match = lexerPattern.search(originalString,i)
+			searches += 1
+			runEnd = match.start() if match else len(originalString)
+
+			#copy the code up to the comment as a single run, noting where every line begins
+			newlinePos = originalString.find('\n',i,runEnd)
+			while newlinePos != -1:
+				self.lineIndex.append(cleanedLen+newlinePos-i+1,lineCount)
+				lineCount += 1
+				newlinePos = originalString.find('\n',newlinePos+1,runEnd)
+			runs.append(originalString[i:runEnd])
+			cleanedLen += runEnd-i
+
+			if not match:
+				break
+
+			i = match.start()
+			if match.lastgroup == 'inlineComment':
+				#find the end of the line and jog forward. The newline itself is code
+				#the search starts one character past the comment marker
+				i = originalString.find("\n",i+inlineCommentLen+1)
+
+				#if we didn't find the end of the line, that is the end of the file
+				if i == -1:
+					break
+				continue
+
+			blockComment = self.blockComments[int(match.lastgroup[len('blockComment'):])]
+			prevI = i
+			if type(blockComment['start']) == str:
+				#jog forward past the end of the block comment
+				blockCommentLen = len(blockComment['start'])
+				endPos = originalString.find(blockComment['end'],i+blockCommentLen)
+				if endPos == -1:
+					break
+				i = endPos+blockCommentLen
+
+				#still want to see the comments, just not what is inside
+				runs.append(blockComment['start'] + blockComment['end'])
+				cleanedLen += len(runs[-1])
+			else:
+				#is a regex blockcomment... sigh js sigh...
+				endMatch = blockComment['end'].search(originalString,match.end())
+				if not endMatch:
+					break
+				i = endMatch.end()
 
-						if i==-1+blockCommentLen:
-							#if we can't find the blockcomment and have reached the end of the file
-							#return the cleaned file
-							return
+			#increment the newlines
+			lineCount += originalString.count('\n',prevI,i)
 
-						#increment the newlines
-						lineCount+=originalString[prevI:i].count('\n')
+		self.fileString = ''.join(runs)
 
-						#still want to see the comments, just not what is inside
-						self.sourceString.append(blockComment['start'] + blockComment['end'])
+		if PROFILE:
+			PROFILE.count('regexSearches',searches)
 
-						break
-				else:
-					#is a regex blockcomment... sigh js sigh...
-					match = blockComment['start'].match(originalString[i:])
-					if match:
-						#print match.group(0)
-						#print originalString[i-5:i+5]
-						prevI = i
-
-						endMatch = blockComment['end'].search(originalString[i+match.end(0):])
-
-						if endMatch:
-							i = i+match.end(0)+endMatch.end(0)
-						else:
-							return
-
-						#increment the newlines
-						lineCount+=originalString[prevI:i].count('\n')
-						break
-			else:
-				#check if the next characters are an inline comment
-				if originalString[i:][:inlineCommentLen] == self.inlineComments:
-					#if so, find the end of the line and jog forward. Add one to jog past the newline
-					i = originalString.find("\n",i+inlineCommentLen+1)
-
-					#if we didn't find the end of the line, that is the end of the file. Return
-					if i==-1:
-						return
-				else:
-					#Otherwise, it is not a comment. Add to returnstr
-					self.sourceString.append(originalString[i])
 
-					#if the originalString is a newline, then we must note this
-					if originalString[i]=='\n':
-						self.characterToLineMap[len(self.sourceString)] = lineCount
-						lineCount += 1
-					i+=1
+def _countGroupsAndNodes(group):
+	'''
+	How many groups and nodes are in this group including itself, before the nodes were gathered into the file group
+	'''
+	groupCount, nodeCount = 1, len(group.nodes)
+	for subgroup in group.subgroups:
+		subgroupCount, subgroupNodeCount = _countGroupsAndNodes(subgroup)
+		groupCount += subgroupCount
+		nodeCount += subgroupNodeCount
+	return groupCount, nodeCount
+
+def _useImplementation(implementation):
+	'''
+	Overwrite all of the classes with the implementation's classes
+	So if we are working with a javascript file, the implementation variable points to javascript.py
+	Then, we overwrite every class in engine.py with all of the javascript.py's classes
+	'''
+	global Node,Edge,Group,Mapper,SourceCode
+	Node = implementation.Node
+	Edge = implementation.Edge
+	Group = implementation.Group
+	Mapper = implementation.Mapper
+	SourceCode = implementation.SourceCode
+
+def _initParseWorker(implementationName,debug,profiling):
+	'''
+	Runs once in every worker process of the parsing pool
+	'''
+	global parseWorkerMapper
+	__builtin__.DEBUG = debug
+	setProfile(Profile() if profiling else None)
+	implementation = importlib.import_module(implementationName)
+	parseWorkerMapper = implementation.Mapper(implementation,[])
+
+def _parseFileInWorker(filenameAndString):
+	'''
+	Parse one file in a worker process
+	Returns the outline, the counters of the profile, and why the file could not be parsed (or None) for the parent
+	'''
+	filename,fileString = filenameAndString
+	uidStart = currentUID
+	try:
+		fileGroup = parseWorkerMapper._generateFileGroup(filename,fileString)
+		outline, error = parseWorkerMapper._generateFileOutline(fileGroup,uidStart), None
+	except Exception as e:
+		outline, error = None, _describeError(e)
+	return outline, PROFILE.takeCounters() if PROFILE else None, error
+
+def _runParseWorker(connection,initargs):
+	'''
+	The loop of a parse worker process. Parse the files sent through the connection one at a time until None is sent
+	'''
+	_initParseWorker(*initargs)
+	while True:
+		filenameAndString = connection.recv()
+		if filenameAndString is None:
+			return
+		connection.send(_parseFileInWorker(filenameAndString))
+
+def _describeError(e):
+	if DEBUG:
+		traceback.print_exc()
+	return '%s: %s'%(type(e).__name__,e)
+
+class _ParseWorker(object):
+	'''
+	A process which parses one file at a time for the parent
+	When a file takes too long, the process is killed and a new one is started for the next file
+	'''
+
+	#How often the parent checks whether any of the workers is done
+	POLL_SECONDS = 0.01
 
+	def __init__(self,initargs):
+		self.initargs = initargs
+		self.index = None
+		self.started = None
+		self._startProcess()
+
+	def _startProcess(self):
+		self.connection, workerConnection = multiprocessing.Pipe()
+		self.process = multiprocessing.Process(target=_runParseWorker,args=(workerConnection,self.initargs))
+		self.process.daemon = True
+		self.process.start()
+		workerConnection.close()
+
+	def parse(self,index,filenameAndString):
+		self.index = index
+		self.started = time.time()
+		self.connection.send(filenameAndString)
+
+	def receive(self):
+		'''
+		The result of the file being parsed. If the process died, it is started again
+		'''
+		try:
+			result = self.connection.recv()
+		except EOFError:
+			result = (None,None,'The parse worker died (exit code %s)'%self.process.exitcode)
+			self.restart()
+		self.index = None
+		return result
+
+	def restart(self):
+		self.process.terminate()
+		self.process.join()
+		self.connection.close()
+		self.index = None
+		self._startProcess()
+
+	def stop(self):
+		try:
+			self.connection.send(None)
+		except IOError:
+			pass
+		self.process.join(1)
+		if self.process.is_alive():
+			self.process.terminate()
+			self.process.join()
+		self.connection.close()
 
 class Mapper(object):
 	'''
@@ -763,27 +1459,35 @@ class Mapper(object):
 	SINGLE_QUOTE_PATTERN = re.compile(r'(?<!\\)"')
 	DOUBLE_QUOTE_PATTERN = re.compile(r"(?<!\\)'")
 
-	files = {}
-
-	def __init__(self,implementation,files):
+	def __init__(self,implementation,files,jobs=1,cache=None,readThreads=DEFAULT_READ_THREADS,maxFileBytes=None,fileTimeout=None):
 		'''
 		Two things are happening:
 		1. We are overwriting all of the classes with the implementation's classes
 			So if we are working with a javascript file, the implementation variable points to javascript.py
 			Then, we overwrite every class in engine.py with all of the javascript.py's classes
 		2. We are loading the source files into the mapper class
+
+		jobs is the number of processes used to parse the files
+		cache is an optional parsecache.ParseCache which unchanged files are loaded from
+		readThreads is the number of threads the files are read with
+
+		Files larger than maxFileBytes are skipped without being read
+		Files which take longer than fileTimeout seconds to parse are dropped. They are parsed in worker processes which are killed when time runs out
+		Files which fail to parse are always dropped
 		'''
 
-		global Node,Edge,Group,Mapper,SourceCode
-		Node = implementation.Node
-		Edge = implementation.Edge
-		Group = implementation.Group
-		Mapper = implementation.Mapper
-		SourceCode = implementation.SourceCode
+		_useImplementation(implementation)
+		self.implementationName = implementation.__name__
+		self.jobs = jobs
+		self.cache = cache
+		self.readThreads = readThreads
+		self.maxFileBytes = maxFileBytes
+		self.fileTimeout = fileTimeout
 
-		for f in files:
-			with open(f) as fi:
-				self.files[f] = fi.read()
+		self.files = {}
+		with timePhase(PROFILE,'read'):
+			for filename, fileString in self._readFiles(files):
+				self.files[filename] = fileString
 
 
 	def map(self):
@@ -798,49 +1502,385 @@ class Mapper(object):
 		'''
 
 		#get the filename and the fileString
-		#only first file for now
-		nodes = []
-		fileGroups = []
-		for filename,fileString in self.files.items():
-			#remove .py from filename
-			filename = self.simpleFilename(filename)
-			print "Mapping %s"%filename
-
-			#generate sourcecode (remove comments and add line numbers)
-			source = SourceCode(fileString)
+		files = self.files.items()
+		self.fileGroups = {}
+		self.fileNodes = {}
+		for filename, fileGroup in self._generateFileGroups(files):
+			self.fileGroups[filename] = fileGroup
 
-			#Create all of the subgroups (classes) and nodes (functions) for this file
-			print "Generating function nodes..."
-			fileGroup = self.generateFileGroup(name=filename,source=source)
-			fileGroups.append(fileGroup)
+			#Keep the nodes generated for each file. Copied because _allNodes returns the group's own list
+			self.fileNodes[filename] = list(fileGroup._allNodes())
 
-			#Append nodes generated to all nodes
-			nodes += fileGroup._allNodes()
+		#Files which could not be parsed were dropped
+		self.filenames = [filename for filename,fileString in files if filename in self.fileGroups]
 
 		#Trimming the groups mostly removes those groups with no function nodes
-		for group in fileGroups:
-			group.trimGroups()
-			if DEBUG:
-				print "Post trim, %s"%group.name
-				group._pprint()
+		with timePhase(PROFILE,'trim'):
+			for filename in self.filenames:
+				group = self.fileGroups[filename]
+				group.trimGroups()
+				if DEBUG:
+					print "Post trim, %s"%group.name
+					group._pprint()
 
 		#Figure out what functions map to what
 		print "Generating edges..."
-		edges = generateEdges(nodes)
-
-		#Trim off the nodes (mostly global-frame nodes that don't do anything)
-		finalNodes = []
-		for node in nodes:
-			if not node.isExtraneous(edges):
-				finalNodes.append(node)
-			else:
-				node.parent.nodes.remove(node)
-				del node
+		nodes = self._allFileNodes()
+		with timePhase(PROFILE,'edges'):
+			edges = generateEdges(nodes,jobs=self.jobs)
 
+		#Only needed when remapping. Built by the first remap
+		self.callersByCallName = None
 
 		#return everything we have done
+		return self._trimExtraneousNodes(nodes,edges)
+
+	def remap(self,filenames):
+		'''
+		Update the mapping after the files in filenames changed, without mapping every file again
+		map must have been called first
+
+		I.   Put back the nodes which were trimmed as extraneous. Whether they still are depends on the new edges
+		II.  Generate new groups for the changed files. Files which no longer exist are dropped
+		III. Keep the edges between unchanged files. Only generate the edges which start or end in a changed file
+		IV.  Trim and return the file groups, function nodes, and edges like map does
+		'''
+		self._restoreExtraneousNodes()
+
+		if self.callersByCallName is None:
+			self.callersByCallName = {}
+			for node in self._allFileNodes():
+				self._indexCaller(node)
+
+		#I. forget everything about the changed files
+		oldNodes = set()
+		for filename in filenames:
+			for node in self.fileNodes.pop(filename,()):
+				oldNodes.add(node)
+				for callName in node.callSites:
+					self.callersByCallName[callName].discard(node)
+			self.fileGroups.pop(filename,None)
+			self.files.pop(filename,None)
+
+		#II. generate the changed files again
+		files = self._readFiles([filename for filename in filenames if os.path.isfile(filename)])
+		self.files.update(files)
+
+		newNodes = []
+		for filename, fileGroup in self._generateFileGroups(files):
+			self.fileGroups[filename] = fileGroup
+			self.fileNodes[filename] = list(fileGroup._allNodes())
+			with timePhase(PROFILE,'trim'):
+				fileGroup.trimGroups()
+			newNodes += self.fileNodes[filename]
+		for node in newNodes:
+			self._indexCaller(node)
+
+		#Files which could not be parsed were dropped
+		self.filenames = [filename for filename in self.filenames if filename in self.fileGroups]
+		self.filenames += [filename for filename,fileString in files if filename in self.fileGroups and filename not in self.filenames]
+
+		#III. edges which start in a changed file can call anything
+		print "Generating edges..."
+		nodes = self._allFileNodes()
+		with timePhase(PROFILE,'edges'):
+			newNodeSet = set(newNodes)
+			links = set((node0,node1) for node0,node1 in self.edges.pairs() if node0 not in oldNodes and node1 not in oldNodes)
+			newNodeIndexes = [i for i, node in enumerate(nodes) if node in newNodeSet]
+			callers, callees = _generateLinks(nodes,_indexNodesByCallName(nodes),newNodeIndexes)
+			for callerIndex, calleeIndex in itertools.izip(callers,callees):
+				links.add((nodes[callerIndex],nodes[calleeIndex]))
+
+			#edges which end in a changed file can only come from the callers which call one of its names
+			for node1 in newNodes:
+				for callName in node1.getCallNames():
+					for node0 in self.callersByCallName.get(callName,()):
+						if node0 not in newNodeSet:
+							countProfile('linksToCalls')
+							if node0.linksTo(node1):
+								links.add((node0,node1))
+
+			#Same order as generateEdges. The new edge list counts the degrees of the nodes again
+			nodeOrder = dict((node,i) for i, node in enumerate(nodes))
+			links = sorted((nodeOrder[node0],nodeOrder[node1]) for node0,node1 in links)
+			edges = EdgeList(nodes,[callerIndex for callerIndex,calleeIndex in links],[calleeIndex for callerIndex,calleeIndex in links])
+
+		#IV.
+		return self._trimExtraneousNodes(nodes,edges)
+
+	def _allFileNodes(self):
+		'''
+		The nodes of every file in file order
+		'''
+		nodes = []
+		for filename in self.filenames:
+			nodes += self.fileNodes[filename]
+		return nodes
+
+	def _indexCaller(self,node):
+		'''
+		Remember which nodes call which names so that a remap can find the callers of a changed file
+		'''
+		for callName in node.callSites:
+			self.callersByCallName.setdefault(callName,set()).add(node)
+
+	def _trimExtraneousNodes(self,nodes,edges):
+		'''
+		Trim off the nodes (mostly global-frame nodes that don't do anything)
+		Trimmed nodes are remembered with their position so that remap can put them back
+
+		This is one sweep over the nodes. The edges already counted the degree of every node
+		which is also what decides whether the node is a leaf or a trunk
+		Each group which loses nodes has its list of nodes rebuilt once
+		'''
+		self.edges = edges
+		if PROFILE:
+			PROFILE.count('edges',len(edges))
+
+		with timePhase(PROFILE,'trim'):
+			self.trimmedNodes = []
+			finalNodes = []
+			trimmedByParent = {}
+			for node in nodes:
+				node.isLeaf = not node.outDegree
+				node.isTrunk = not node.inDegree
+				if not node.isExtraneous():
+					finalNodes.append(node)
+				else:
+					trimmedByParent.setdefault(node.parent,set()).add(node)
+
+			for parent, trimmed in trimmedByParent.items():
+				keptNodes = []
+				for position, node in enumerate(parent.nodes):
+					if node in trimmed:
+						self.trimmedNodes.append((node,position))
+					else:
+						keptNodes.append(node)
+				parent.nodes[:] = keptNodes
+
+		fileGroups = [self.fileGroups[filename] for filename in self.filenames]
 		return fileGroups,finalNodes,edges
 
+	def _restoreExtraneousNodes(self):
+		'''
+		Undo _trimExtraneousNodes
+		Positions are where the nodes were before any were trimmed so they are put back from first to last
+		'''
+		for node, position in sorted(self.trimmedNodes,key=lambda trimmedNode: trimmedNode[1]):
+			node.parent.nodes.insert(position,node)
+		self.trimmedNodes = []
+
+	def _generateFileGroups(self,files):
+		'''
+		Parse every (filename,fileString) into a file group and return the (filename,fileGroup) pairs
+		Files found in the cache are rebuilt from their outlines without being parsed
+		With more than one job or a fileTimeout, the other files are parsed in worker processes and also rebuilt from their outlines
+		Files which could not be parsed are dropped (see _dropFile)
+		'''
+		global currentUID
+
+		keys = [None]*len(files)
+		outlines = [None]*len(files)
+		if self.cache:
+			with timePhase(PROFILE,'cache'):
+				for i, (filename,fileString) in enumerate(files):
+					keys[i] = self.cache.generateKey(filename,fileString,self.implementationName)
+					outlines[i] = self.cache.get(keys[i])
+
+		toParse = [i for i in range(len(files)) if outlines[i] is None]
+		if PROFILE:
+			PROFILE.count('files',len(files))
+			PROFILE.count('bytes',sum(len(fileString) for filename,fileString in files))
+			if self.cache:
+				PROFILE.count('cacheHits',len(files)-len(toParse))
+				PROFILE.count('cacheMisses',len(toParse))
+
+		errors = {}
+		if toParse and (self.fileTimeout or (self.jobs > 1 and len(toParse) > 1)):
+			#Schedule the largest files first so that one huge file does not finish last and hold up the run
+			toParse.sort(key=lambda i: len(files[i][1]),reverse=True)
+			with timePhase(PROFILE,'parse'):
+				parsed = self._parseInWorkers(files,toParse)
+			for i in toParse:
+				outline, counters, error = parsed[i]
+				if counters:
+					PROFILE.addCounters(counters)
+				if error:
+					errors[i] = error
+					continue
+				outlines[i] = outline
+				if self.cache:
+					with timePhase(PROFILE,'cache'):
+						self.cache.set(keys[i],outline)
+
+		#Build in the original file order so that the UIDs are the same as parsing everything in this process
+		fileGroups = []
+		for i, (filename,fileString) in enumerate(files):
+			if i in errors:
+				self._dropFile(filename,errors[i])
+				continue
+
+			if outlines[i] is not None:
+				with timePhase(PROFILE,'cache'):
+					fileGroups.append((filename,self._fileGroupFromOutline(outlines[i])))
+				continue
+
+			uidStart = currentUID
+			try:
+				fileGroup = self._generateFileGroup(filename,fileString)
+			except Exception as e:
+				#Give the UIDs back so that the other files get the same UIDs as they would in a worker
+				currentUID = uidStart
+				self._dropFile(filename,_describeError(e))
+				continue
+			if self.cache:
+				with timePhase(PROFILE,'cache'):
+					self.cache.set(keys[i],self._generateFileOutline(fileGroup,uidStart))
+			fileGroups.append((filename,fileGroup))
+
+		if self.cache:
+			with timePhase(PROFILE,'cache'):
+				self.cache.evict()
+
+		if PROFILE:
+			for filename, fileGroup in fileGroups:
+				groupCount, nodeCount = _countGroupsAndNodes(fileGroup)
+				PROFILE.count('groups',groupCount)
+				PROFILE.count('nodes',nodeCount)
+
+		return fileGroups
+
+	def _parseInWorkers(self,files,toParse):
+		'''
+		Parse files[i] for every i in toParse in worker processes
+		Returns {i:(outline,counters,error)}. See _parseFileInWorker
+
+		Every worker parses one file at a time so a file which runs past fileTimeout is stopped by killing its worker
+		'''
+		initargs = (self.implementationName,DEBUG,bool(PROFILE))
+		workers = [_ParseWorker(initargs) for i in range(max(1,min(self.jobs,len(toParse))))]
+		toSend = list(toParse)
+		parsed = {}
+		try:
+			while len(parsed) < len(toParse):
+				idle = True
+				for worker in workers:
+					if worker.index is None:
+						if toSend:
+							i = toSend.pop(0)
+							worker.parse(i,files[i])
+						continue
+
+					if worker.connection.poll():
+						i = worker.index
+						parsed[i] = worker.receive()
+						idle = False
+					elif self.fileTimeout and time.time()-worker.started > self.fileTimeout:
+						i = worker.index
+						parsed[i] = (None,None,'Took longer than %g seconds'%self.fileTimeout)
+						worker.restart()
+						idle = False
+				if idle:
+					time.sleep(_ParseWorker.POLL_SECONDS)
+		finally:
+			for worker in workers:
+				worker.stop()
+		return parsed
+
+	def _readFiles(self,filenames):
+		'''
+		Return the (filename,fileString) pairs of the files which are not too large and are not filtered out
+		'''
+		if self.maxFileBytes:
+			keptFilenames = []
+			for filename in filenames:
+				fileBytes = os.path.getsize(filename)
+				if fileBytes > self.maxFileBytes:
+					print "Skipping %s which is %d bytes. The limit is %d bytes"%(filename,fileBytes,self.maxFileBytes)
+					countProfile('droppedFiles')
+				else:
+					keptFilenames.append(filename)
+			filenames = keptFilenames
+		return self.filterFiles(zip(filenames,readFiles(filenames,self.readThreads)))
+
+	def _dropFile(self,filename,reason):
+		'''
+		Forget a file which could not be parsed
+		'''
+		print "Dropping %s. %s"%(filename,reason)
+		countProfile('droppedFiles')
+		self.files.pop(filename,None)
+
+	def _generateFileGroup(self,filename,fileString):
+		'''
+		Generate the sourcecode and the file group for a single file
+		'''
+		#remove .py from filename
+		filename = self.simpleFilename(filename)
+		print "Mapping %s"%filename
+
+		#generate sourcecode (remove comments and add line numbers)
+		with timePhase(PROFILE,'strip'):
+			source = SourceCode(fileString)
+		if PROFILE:
+			PROFILE.count('bytesStripped',len(fileString)-len(source.fileString))
+
+		#Create all of the subgroups (classes) and nodes (functions) for this file
+		print "Generating function nodes..."
+		with timePhase(PROFILE,'groups'):
+			return self.generateFileGroup(name=filename,source=source)
+
+	def _generateFileOutline(self,fileGroup,uidStart):
+		'''
+		Return the picklable outline of a freshly generated file group
+		uidStart is the first UID used by the file. UIDs in the outline are counted from zero and are shifted when the file group is rebuilt
+		'''
+		return {
+			'fileString':fileGroup.source.fileString
+			,'lineStarts':fileGroup.source.lineIndex.lineStarts
+			,'lineNumbers':fileGroup.source.lineIndex.lineNumbers
+			,'group':fileGroup._generateOutline(uidStart)
+			,'uidCount':currentUID-uidStart
+			}
+
+	def _fileGroupFromOutline(self,outline):
+		'''
+		Rebuild the file group, subgroups, and nodes from a file outline without parsing the file again
+		'''
+		global currentUID
+		fileSource = SourceCode(outline['fileString'],lineIndex=LineIndex(outline['lineStarts'],outline['lineNumbers']))
+		fileGroup = self._fromOutline(Group,outline['group'],None,fileSource,currentUID)
+		currentUID += outline['uidCount']
+		return fileGroup
+
+	def _fromOutline(self,cls,outline,parent,fileSource,uidOffset):
+		'''
+		Rebuild a group or node from its outline
+		Bypasses __init__ because __init__ is where the parsing happens
+		'''
+		obj = cls.__new__(cls)
+		obj.__dict__.update(outline['attributes'])
+		obj.uid += uidOffset
+		obj.parent = parent
+
+		obj.source = fileSource._fromSpans(outline['source'])
+		if outline['fullSource'] is None:
+			obj.fullSource = obj.source
+		else:
+			obj.fullSource = fileSource._fromSpans(outline['fullSource'])
+
+		if 'nodes' in outline:
+			obj.nodes = [self._fromOutline(Node,node,obj,fileSource,uidOffset) for node in outline['nodes']]
+			obj.subgroups = [self._fromOutline(Group,subgroup,obj,fileSource,uidOffset) for subgroup in outline['subgroups']]
+		return obj
+
+	def filterFiles(self,files):
+		'''
+		Return the (filename,fileString) pairs which should be mapped
+		Probably superclassed to skip files which can not be mapped well
+		'''
+		return files
+
 	def generateFileGroup(self,name,source):
 		'''
 		Dummy function probably superclassed
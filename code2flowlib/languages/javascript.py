@@ -6,6 +6,360 @@ Functions that begin with an "_" are local and do not replace anything in engine
 
 from code2flowlib.engine import *
 
+#How far back from an open bracket to look for what defines the block
+DEFINITION_WINDOW = 2000
+
+WORD_CHARACTERS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
+NAME_CHARACTERS = WORD_CHARACTERS|frozenset('.')
+WHITESPACE = frozenset(' \t\n\r\f\v')
+
+#Minified and generated files are skipped or only have the names of their functions mapped (see Mapper)
+#Hand written javascript averages well under 100 characters per line. Minified javascript averages thousands
+MINIFIED_LINE_LENGTH = 300
+MINIFIED_MIN_BYTES = 1024
+sourceMapPattern = re.compile(r"^[ \t]*//[#@][ \t]*sourceMappingURL=",re.MULTILINE)
+generatedBannerPattern = re.compile(r"@generated\b|do not edit|auto-?generated|automatically generated",re.IGNORECASE)
+
+#The comments at the very start of the file, after any byte order mark and #! line. A banner is only looked for in these
+#so that a hand written file which mentions generated code or says not to edit something further down is still mapped
+BANNER_BYTES = 1024
+leadingCommentsPattern = re.compile(r"(?:\xef\xbb\xbf)?(?:#![^\n]*)?(?:\s*(?://[^\n]*|/\*.*?(?:\*/|\Z)))+",re.DOTALL)
+
+def getMinifiedReason(fileString):
+	'''
+	Why this file looks minified or generated or None if it does not
+	Only looks at the length of the lines, the end of the file for a source map, and the comments at the start of the file for a banner so it is cheap for any size of file
+	'''
+	if len(fileString) >= MINIFIED_MIN_BYTES:
+		lineLength = len(fileString)//(fileString.count('\n')+1)
+		if lineLength > MINIFIED_LINE_LENGTH:
+			return "is minified (%d characters per line)"%lineLength
+	if sourceMapPattern.search(fileString,max(0,len(fileString)-512)):
+		return "has a sourceMappingURL comment"
+	leadingComments = leadingCommentsPattern.match(fileString,0,BANNER_BYTES)
+	if leadingComments and generatedBannerPattern.search(leadingComments.group(0)):
+		return "has a generated file banner"
+	return None
+
+#Function definitions found in minified files without matching any brackets e.g. function a(, a.b = function, b: function
+namedFunctionPattern = re.compile(r"\bfunction\s+(\w+)\s*\(|\b(\w+)\s*[:=]\s*function\b")
+
+#Every word and every other character which is not whitespace is a token
+tokenPattern = re.compile(r"\w+|\S")
+
+class TokenStream(BracketTable):
+	'''
+	The tokens of the cleaned file source (comments and strings already removed)
+
+	The file is lexed once, the first time anything is asked of it, and the stream is shared by every piece of sourcecode cut from that file.
+	It is the bracket table of javascript sources. The brackets it finds while lexing are matched by engine.BracketTable
+	Everything the groups and nodes need is indexed while lexing:
+		starts, ends: where every token begins and ends in the cleaned file source. The text is only cut out of the file when it is needed
+		parens: the index of every ( token, to find the parameters of functions
+		openBrackets, closeBrackets: the positions of every { and }
+		callPositions, callNames, chainStarts, parenPositions: every call site e.g. a.b.c( sorted by where the bare name begins
+		returnPositions: every return
+
+	Uses numpy when it is installed and a single pass of the token regex otherwise
+	Only the file source is pickled. Anything else is lexed again if it is ever needed
+	'''
+	def __init__(self,fileString):
+		super(TokenStream,self).__init__(fileString,'{','}')
+		self.starts = None
+
+	def __getstate__(self):
+		return {'fileString':self.fileString,'openBracket':self.openBracket,'closeBracket':self.closeBracket,'closePositions':None,'starts':None}
+
+	def getToken(self,i):
+		return self.fileString[self.starts[i]:self.ends[i]]
+
+	def isWordToken(self,i):
+		return self.fileString[self.starts[i]] in WORD_CHARACTERS
+
+	def isNameToken(self,i):
+		'''
+		A word or a dot
+		'''
+		return self.fileString[self.starts[i]] in NAME_CHARACTERS
+
+	def findOpenBracket(self,start,end):
+		'''
+		Position of the first { from start up to end or -1
+		'''
+		self._lex()
+		i = bisect.bisect_left(self.openBrackets,start)
+		if i < len(self.openBrackets) and self.openBrackets[i] < end:
+			return self.openBrackets[i]
+		return -1
+
+	def findCloseBracket(self,start,end):
+		'''
+		Position of the last } from start up to end or -1
+		'''
+		self._lex()
+		i = bisect.bisect_left(self.closeBrackets,end)-1
+		if i >= 0 and self.closeBrackets[i] >= start:
+			return self.closeBrackets[i]
+		return -1
+
+	def getCallSites(self,spans):
+		'''
+		The call sites within the spans indexed like engine.generateCallSites
+		A position is where the bare name begins in the file. The namespace chain stops at the start of the span
+		'''
+		self._lex()
+		callSites = {}
+		for spanStart,spanEnd in spans:
+			i = bisect.bisect_left(self.callPositions,spanStart)
+			while i < len(self.callPositions) and self.parenPositions[i] < spanEnd:
+				namePos = self.callPositions[i]
+				chain = self.fileString[max(self.chainStarts[i],spanStart):namePos]
+				callSites.setdefault(self.callNames[i],[]).append((namePos,chain))
+				i += 1
+		return callSites
+
+	def hasReturn(self,spans):
+		'''
+		Whether there is a return statement within the spans with something before and after it
+		'''
+		self._lex()
+		sourceStart, sourceEnd = spans[0][0], spans[-1][1]
+		for spanStart,spanEnd in spans:
+			i = bisect.bisect_left(self.returnPositions,max(spanStart,sourceStart+1))
+			if i < len(self.returnPositions) and self.returnPositions[i]+len('return') <= min(spanEnd,sourceEnd-1):
+				return True
+		return False
+
+	def _findBrackets(self):
+		self._lex()
+		return self.openBrackets, self.closeBrackets
+
+	def _lex(self):
+		if self.starts is not None:
+			return
+		if numpy:
+			self._lexWithNumpy()
+		else:
+			self._lexWithRegex()
+		countProfile('tokens',len(self.starts))
+
+	def _lexWithRegex(self):
+		'''
+		One pass of the token regex indexing each token as it is found
+		'''
+		fileString = self.fileString
+		self.starts, self.ends = array.array('l'), array.array('l')
+		self.parens = array.array('l')
+		self.openBrackets, self.closeBrackets = array.array('l'), array.array('l')
+		self.callPositions, self.chainStarts, self.parenPositions = array.array('l'), array.array('l'), array.array('l')
+		self.callNames = []
+		self.returnPositions = array.array('l')
+
+		for i, match in enumerate(tokenPattern.finditer(fileString)):
+			start, end = match.span()
+			self.starts.append(start)
+			self.ends.append(end)
+			token = match.group()
+			if token == '(':
+				self.parens.append(i)
+				if i and self.isWordToken(i-1):
+					#the namespace chain begins where the run of words and dots which touch each other begins
+					chainIndex = i-1
+					while chainIndex and self.isNameToken(chainIndex-1) and self.ends[chainIndex-1] == self.starts[chainIndex]:
+						chainIndex -= 1
+					self.callPositions.append(self.starts[i-1])
+					self.callNames.append(self.getToken(i-1))
+					self.chainStarts.append(self.starts[chainIndex])
+					self.parenPositions.append(start)
+			elif token == '{':
+				self.openBrackets.append(start)
+			elif token == '}':
+				self.closeBrackets.append(start)
+			elif token == 'return':
+				self.returnPositions.append(start)
+
+	def _lexWithNumpy(self):
+		'''
+		The same indexes from the character classes of the file
+		A token starts at every character which is not whitespace and does not continue a word, and ends the same way
+		'''
+		fileString = self.fileString
+		characters = numpy.frombuffer(fileString,dtype=numpy.uint8)
+		isWord = _WORD_TABLE[characters]
+		isToken = ~_WHITESPACE_TABLE[characters]
+		continuesWord = numpy.zeros(len(characters),dtype=bool)
+		continuesWord[1:] = isWord[1:] & isWord[:-1]
+		wordContinues = numpy.zeros(len(characters),dtype=bool)
+		wordContinues[:-1] = continuesWord[1:]
+		starts = numpy.flatnonzero(isToken & ~continuesWord)
+		ends = numpy.flatnonzero(isToken & ~wordContinues)+1
+		firstCharacters = characters[starts]
+
+		parens = numpy.flatnonzero(firstCharacters == ord('('))
+		openBrackets = starts[firstCharacters == ord('{')]
+		closeBrackets = starts[firstCharacters == ord('}')]
+
+		#a call site is a word and then a (. Its namespace chain begins where the run of words and dots which touch each other begins
+		callParens = parens[parens > 0]
+		callParens = callParens[_WORD_TABLE[firstCharacters[callParens-1]]]
+		nameIndexes = callParens-1
+		isName = _NAME_TABLE[firstCharacters]
+		joinsPrevious = numpy.zeros(len(starts),dtype=bool)
+		joinsPrevious[1:] = isName[1:] & isName[:-1] & (ends[:-1] == starts[1:])
+		runStarts = numpy.maximum.accumulate(numpy.where(joinsPrevious,0,numpy.arange(len(starts))))
+
+		returnCandidates = starts[(ends-starts == len('return')) & (firstCharacters == ord('r'))].tolist()
+
+		self.starts = array.array('l',starts.tolist())
+		self.ends = array.array('l',ends.tolist())
+		self.parens = array.array('l',parens.tolist())
+		self.openBrackets = array.array('l',openBrackets.tolist())
+		self.closeBrackets = array.array('l',closeBrackets.tolist())
+		self.callPositions = array.array('l',starts[nameIndexes].tolist())
+		self.callNames = [fileString[start:end] for start, end in zip(self.callPositions,ends[nameIndexes].tolist())]
+		self.chainStarts = array.array('l',starts[runStarts[nameIndexes]].tolist())
+		self.parenPositions = array.array('l',starts[callParens].tolist())
+		self.returnPositions = array.array('l',[start for start in returnCandidates if fileString.startswith('return',start)])
+
+if numpy:
+	_WORD_TABLE = numpy.zeros(256,dtype=bool)
+	_WORD_TABLE[[ord(character) for character in WORD_CHARACTERS]] = True
+	_NAME_TABLE = numpy.zeros(256,dtype=bool)
+	_NAME_TABLE[[ord(character) for character in NAME_CHARACTERS]] = True
+	_WHITESPACE_TABLE = numpy.zeros(256,dtype=bool)
+	_WHITESPACE_TABLE[[ord(character) for character in WHITESPACE]] = True
+
+def findDefinition(preBlockSource):
+	'''
+	Find what defines the block which begins right after preBlockSource
+	Scans backwards over the tokens before the open bracket, no further than the last close bracket or DEFINITION_WINDOW characters
+
+	Knows about these, tried in this order:
+		function myFunc(a,b)         named function
+		a.b.myFunc = function(a,b)   assignment function (also a: function(a,b) in an object)
+		a.b.myObj =                  object
+		(function(a,b)               anonymous callback
+
+	If more than one definition of the same kind fits, the first one is used
+	Returns (definitionType,name,definitionPos) where definitionPos is where the definitionString begins within preBlockSource
+	Returns None if this is not a block we understand
+	'''
+	tokenStream = preBlockSource.tokenStream
+	tokenStream._lex()
+	start = preBlockSource.spans[0][0]
+	end = preBlockSource.spans[-1][1]
+
+	#Limit the search to the text after the last closed bracket
+	windowStart = max(start,end-DEFINITION_WINDOW)
+	textStart = tokenStream.findCloseBracket(windowStart,end)
+	if textStart == -1:
+		textStart = windowStart
+
+	#the tokens from the first one which ends inside of the text to the last one before the open bracket
+	#the first token can begin before the text when the window cuts a word
+	first = bisect.bisect_right(tokenStream.ends,textStart)
+	last = bisect.bisect_left(tokenStream.starts,end)-1
+	if last < first:
+		return None
+
+	lastToken = tokenStream.getToken(last)
+	if lastToken == '=':
+		definition = _findObjectDefinition(tokenStream,last,first,textStart)
+	elif lastToken == ')':
+		definition = _findFunctionDefinition(tokenStream,last,first,textStart)
+	else:
+		definition = None
+
+	if definition:
+		definitionType, name, definitionPos = definition
+		return definitionType, name, definitionPos-start
+	return None
+
+def _findNameStart(tokenStream,i,first,textStart):
+	'''
+	Where the name (words and dots with nothing between them) which ends with token i begins or None if token i is not part of a name
+	'''
+	if not tokenStream.isNameToken(i):
+		return None
+	while i > first and tokenStream.isNameToken(i-1) and tokenStream.ends[i-1] == tokenStream.starts[i]:
+		i -= 1
+	return max(tokenStream.starts[i],textStart)
+
+def _findObjectDefinition(tokenStream,equalsIndex,first,textStart):
+	'''
+	a.b.myObj =
+	The name needs something in front of it. If it begins the text, what is after its first dot is the name
+	'''
+	if equalsIndex == first:
+		return None
+	nameEnd = tokenStream.ends[equalsIndex-1]
+	nameStart = _findNameStart(tokenStream,equalsIndex-1,first,textStart)
+	if nameStart is None:
+		return None
+	if nameStart == textStart:
+		nameStart = tokenStream.fileString.find('.',nameStart,nameEnd-1)+1
+		if not nameStart:
+			return None
+	return 'object', tokenStream.fileString[nameStart:nameEnd], nameStart
+
+def _findFunctionDefinition(tokenStream,closeParenIndex,first,textStart):
+	'''
+	Try every open parenthesis before the close parenthesis as the start of the parameters
+	Named functions win over assignments which win over anonymous callbacks
+	Within each kind, the first one wins
+	'''
+	definitions = {}
+	parens = tokenStream.parens
+	for i in xrange(bisect.bisect_left(parens,closeParenIndex)-1,bisect.bisect_left(parens,first)-1,-1):
+		definition = _findFunctionKeyword(tokenStream,parens[i],first,textStart)
+		if definition:
+			definitions[definition[0]] = definition[1:]
+
+	for kind, definitionType in (('named','function'),('assigned','function'),('anonymous','anonFunction')):
+		if kind in definitions:
+			name, definitionPos = definitions[kind]
+			return definitionType, name, definitionPos
+	return None
+
+def _findFunctionKeyword(tokenStream,parenIndex,first,textStart):
+	'''
+	Given the open parenthesis of the parameters, what kind of function this is if it is one
+	The word before the parenthesis must be inside of the text and not begin it
+	Returns (kind,name,definitionPos) or None
+	'''
+	wordIndex = parenIndex-1
+	if wordIndex < first or not tokenStream.isWordToken(wordIndex):
+		return None
+	wordStart = tokenStream.starts[wordIndex]
+	if wordStart <= textStart or wordIndex == first:
+		return None
+
+	word = tokenStream.getToken(wordIndex)
+	before = wordIndex-1
+	beforeToken = tokenStream.getToken(before)
+	if word != 'function':
+		#function myFunc(
+		#'function' must be separated from the name and be preceded by something
+		if beforeToken != 'function' or tokenStream.starts[before] <= textStart:
+			return None
+		return 'named', word, tokenStream.starts[before]
+
+	if beforeToken in (':','='):
+		#a.b.myFunc = function(
+		#the name must be preceded by something which is not part of a name
+		if before == first:
+			return None
+		nameStart = _findNameStart(tokenStream,before-1,first,textStart)
+		if nameStart is None or nameStart == textStart:
+			return None
+		return 'assigned', tokenStream.fileString[nameStart:tokenStream.ends[before-1]], nameStart
+
+	if beforeToken == '(':
+		#(function(
+		return 'anonymous', '(anon)', wordStart
+
+	return None
+
 class Node(Node):
 	sameScopeKeyword = 'this'
 
@@ -15,28 +369,28 @@ class Node(Node):
 		#window.any.namespace is exactly the same as any.namespace
 		#TODO when a function is defined within another function, there is no need for self keyword
 
-		#pdb.set_trace()
+		callSites = self.callSites.get(other.name)
+		if not callSites:
+			return False
 
 		#if they are part of the same namespace, we can use the self keyword
 		if other.parent == self.parent:
-			if any(map(lambda pattern: pattern.search(self.source.sourceString), other.sameScopePatterns)):
+			sameScopeChain = self.sameScopeKeyword+'.'
+			if any(chain == sameScopeChain for characterPos, chain in callSites):
 				return True
 
-		#if other.name == 'c':
-		#	pdb.set_trace()
-
 		#Otherwise, they can always be linked by a shared namespace
-		#must generate namespace here because we are trimming the groups AFTER init of the node
-		if any(map(lambda pattern: pattern.search(self.source.sourceString), other.generateAnyScopePatterns())):
+		#anyScopeCalls is generated the first time it is read which is after the groups were trimmed
+		if any(chain+other.name in other.anyScopeCalls for characterPos, chain in callSites):
 			return True
 
 		return False
 
 	def getNamespace(self):
 		if self.parent.name != self.name:
-			return self.parent.getNamespace()
+			return self.parent.namespace
 		else:
-			return self.parent.parent.getNamespace()
+			return self.parent.parent.namespace
 
 
 	def generateAnyScopePatterns(self):
@@ -44,25 +398,24 @@ class Node(Node):
 		How you would call this node from any scope
 		'''
 		return super(Node,self).generateAnyScopePatterns()+[
-			re.compile(r"(?:[^a-zA-Z0-9\.]|\A)window\.%s\s*\("%(self.getFullName()),re.MULTILINE|re.DOTALL)
+			compilePattern(r"(?:[^a-zA-Z0-9\.]|\A)window\.%s\s*\("%(self.fullName),re.MULTILINE|re.DOTALL)
 			]
 
+	def generateAnyScopeCalls(self):
+		'''
+		How you would call this node from any scope (window.any.namespace is exactly the same as any.namespace)
+		'''
+		fullName = self.fullName
+		return [fullName,'window.'+fullName]
+
 class Edge(Edge):
-	pass
+	__slots__ = ()
 
 
 class Group(Group):
 	globalFrameName = 'window'
 
-	PATTERNS = [
-		{'type':'function','pattern':re.compile(r".*?\W(function\s+(\w+)\s*\(.*?\)\s*\Z)",re.DOTALL)}
-		,{'type':'function','pattern':re.compile(r".*?[^a-zA-Z0-9_\.]+(([\w\.]+)\s*[\:\=]\s*function\s*\(.*?\)\s*\Z)",re.DOTALL)}
-		,{'type':'object','pattern':re.compile(r".*?\W(([\w\.]+)\s*\=\s*\Z)",re.DOTALL)}
-		,{'type':'anonFunction','pattern':re.compile(r".*?\(\s*(function\s*\(.*?\)\s*\Z)",re.DOTALL)}
-		]
-
-
-	def __init__(self,isFunction=True,isAnon=False,**kwargs):
+	def __init__(self,isFunction=True,isAnon=False,namesOnly=False,**kwargs):
 		'''
 		Generate a new group
 
@@ -74,14 +427,20 @@ class Group(Group):
 		not isFunction would mean the group is an object meant for grouping like a = {b=function,c=function}
 
 		isAnon means the function has no name and is not likely to be called outside of this scope
+
+		namesOnly means the group is a minified file. Make a node for every named function without any subgroups
 		'''
 
 		super(Group,self).__init__(**kwargs)
 		self.isAnon = isAnon
 
+		if namesOnly:
+			self._generateNameNodes()
+			return
+
 		blocksToRemove = []
 
-		openBracket = self.source.find('{')
+		openBracket = self.source.findOpenBracket()
 
 		while openBracket != -1:
 			'''
@@ -121,12 +480,12 @@ class Group(Group):
 				elif newGroup.subgroups:
 					for group in newGroup.subgroups:
 						if group.parent == newGroup:
-							group.parent = self
+							group._reparent(self)
 						group.parent.subgroups.append(group)
 					blocksToRemove.append(newGroup)
 
 			#get the next block to handle
-			openBracket = self.source.find('{',closeBracket)
+			openBracket = self.source.findOpenBracket(closeBracket)
 
 		if isFunction:
 			newNode = self.generateImplicitNode(blocksToRemove)
@@ -134,6 +493,21 @@ class Group(Group):
 
 
 
+	def _generateNameNodes(self):
+		'''
+		A node for every named function in the file, which other files can call but which call nothing
+		Without bracket matching, nothing is known about the source of the functions
+		One character names are mangled by the minifier so they are skipped
+		'''
+		names = set()
+		for match in namedFunctionPattern.finditer(self.source.sourceBuffer):
+			name = match.group(1) or match.group(2)
+			if len(name) == 1 or name in names:
+				continue
+			names.add(name)
+			pos = match.start()
+			self.nodes.append(Node(name=name,source=self.source[pos:pos],definitionString=match.group(0),parent=self,characterPos=pos,lineNumber=self.source.getLineNumber(pos),callSites={},returns=False))
+
 	def getNamespace(self):
 		'''
 		Returns the full string namespace of this group including this group's name
@@ -143,8 +517,8 @@ class Group(Group):
 			return ''
 		else:
 			ret = self.name
-			if self.parent.getNamespace():
-				ret = self.parent.getNamespace() + '.' + ret
+			if self.parent.namespace:
+				ret = self.parent.namespace + '.' + ret
 			return ret
 
 	def trimGroups(self):
@@ -160,17 +534,17 @@ class Group(Group):
 				if not group.nodes:
 					continue
 				if len(group.nodes)==1 and group.nodes[0].name == group.name:
-					group.nodes[0].parent = self
+					group.nodes[0]._reparent(self)
 					self.nodes.append(group.nodes[0])
 					continue
 			savedSubgroups.append(group)
 		self.subgroups = savedSubgroups
 
 	def generateNewObjectPattern(self):
-		return re.compile(r'new\s+%s\s*\('%self.name)
+		return compilePattern(r'new\s+%s\s*\('%self.name)
 
 	def generateNewObjectAssignedPattern(self):
-		return re.compile(r'(\w)\s*=\s*new\s+%s\s*\('%self.name)
+		return compilePattern(r'(\w)\s*=\s*new\s+%s\s*\('%self.name)
 
 	"""
 	def generateNodes(self):
@@ -189,8 +563,8 @@ class Group(Group):
 
 	def generateNamespaces(self):
 		return [
-			self.getNamespace()
-			,'window.'+self.getNamespace() if self.getNamespace() else 'window'
+			self.namespace
+			,'window.'+self.namespace if self.namespace else 'window'
 			]
 
 	def findNamespace(self,namespace,callingGroup=None):
@@ -207,10 +581,7 @@ class Group(Group):
 
 	def generateImplicitNode(self,blocksToRemove):
 		#Get source by subtracting all of the 'spoken for' blocks
-		source = self.source.copy()
-
-		for block in blocksToRemove:
-			source -= block.fullSource
+		source = self.source.subtract([block.fullSource for block in blocksToRemove])
 
 		#Depending on whether or not this is the file root (global frame)
 		#, set a flag and the node name
@@ -222,79 +593,53 @@ class Group(Group):
 			name = self._generateRootNodeName(self.name.rsplit('/',1)[-1])
 
 
-		#generate and append the node
-		return Node(name=name,source=source,definitionString=self.definitionString,parent=self,lineNumber=self.lineNumber,isFileRoot=isFileRoot)#isImplicit=True
+		#generate and append the node. The calls and returns come from the token stream instead of searching the source again
+		tokenStream = source.tokenStream
+		return Node(name=name,source=source,definitionString=self.definitionString,parent=self,lineNumber=self.lineNumber,isFileRoot=isFileRoot,callSites=tokenStream.getCallSites(source.spans),returns=tokenStream.hasReturn(source.spans))#isImplicit=True
 
 	def newGroupFromBlock(self,openBracket,closeBracket):
 		'''
-		Using the sourcecode before the block, try generating a function using all of the patterns we know about
-		If we can generate it, return a new group with the sourcecode within the block
+		Using the sourcecode before the block, try to find what defines the block (see findDefinition)
+		If we can, return a new group with the sourcecode within the block
 		'''
 		preBlockSource = self.source[:openBracket]
 		blockSource = self.source[openBracket:closeBracket+1]
 
-		for pattern in self.PATTERNS:
-			newGroup = self.newGroupFromSourcesAndPattern(preBlockSource,blockSource,pattern)
-			if newGroup:
-				return newGroup
-
-		if DEBUG:
-			print "===================="
-			print preBlockSource.sourceString[-100:]
-			print 'what is this?'
-
-		return None
-
-	def newGroupFromSourcesAndPattern(self,preBlockSource,blockSource,pattern):
-		'''
-		Given a functionPattern to test for, sourcecode before the block, and sourcecode within the block,
-		Try to generate a new group
-
-
-		'''
-
-		#We are looking for a function name
-		#Start by limiting the search area to that inbetween the last closed bracket and here
-		#Then, try to match the pattern
-		lastBracket = preBlockSource.sourceString.rfind('}')
-		if lastBracket == -1:
-			lastBracket = 0
-		match = pattern['pattern'].match(preBlockSource.sourceString[lastBracket:])
-
-		#If we found a match, generate a group
-		if match:
-			#name the function
-			if pattern['type']=='anonFunction':
-				name = "(anon)"
-			else:
-				name = match.group(2)
-
-			#determine what group to attach this to.
-			#if there was a dot in the namespace, we might need to attach this to something other than the group it was defined within
-			attachTo = self
-			if '.' in name:
-				namespace, name = name.rsplit('.',1)
-				group = self.findNamespace(namespace,self)
-				if group:
-					attachTo = group
-
-			#generate the definition and line number
-			definitionString = match.group(1)
-			lineNumber = preBlockSource.getLineNumber(match.start(1)+lastBracket)
-			fullSource = preBlockSource[lastBracket+match.start(1):]+blockSource
-
-			#finally, generate the group
-			return Group(
-				name=name
-				,source=blockSource[1:-1] #source without the brackets
-				,fullSource=fullSource
-				,definitionString=definitionString
-				,parent=attachTo
-				,lineNumber=lineNumber
-				,isFunction=pattern['type'] in ('function','anonFunction')
-				,isAnon=pattern['type'] == 'anonFunction')
-
-		return None
+		definition = findDefinition(preBlockSource)
+		if not definition:
+			if DEBUG:
+				print "===================="
+				print preBlockSource.sourceString[-100:]
+				print 'what is this?'
+			return None
+
+		definitionType, name, definitionPos = definition
+
+		#determine what group to attach this to.
+		#if there was a dot in the namespace, we might need to attach this to something other than the group it was defined within
+		attachTo = self
+		if '.' in name:
+			namespace, name = name.rsplit('.',1)
+			group = self.findNamespace(namespace,self)
+			if group:
+				attachTo = group
+
+		#generate the definition and line number
+		definitionSource = preBlockSource[definitionPos:]
+		definitionString = definitionSource.sourceString
+		lineNumber = preBlockSource.getLineNumber(definitionPos)
+		fullSource = definitionSource+blockSource
+
+		#finally, generate the group
+		return Group(
+			name=name
+			,source=blockSource[1:-1] #source without the brackets
+			,fullSource=fullSource
+			,definitionString=definitionString
+			,parent=attachTo
+			,lineNumber=lineNumber
+			,isFunction=definitionType in ('function','anonFunction')
+			,isAnon=definitionType == 'anonFunction')
 
 	def generateOrAppendToGroup(self,node):
 		openDelimPos = self.source.openDelimPos(node.characterPos)
@@ -319,11 +664,59 @@ class SourceCode(SourceCode):
 		]
 	inlineComments = "//"
 
+	def __init__(self,fileString,lineIndex=None,bracketTable=None,**kwargs):
+		#Only the raw file is checked. Pieces of it and sources rebuilt from the cache already have a line index
+		self.minifiedReason = None if lineIndex else getMinifiedReason(fileString)
+		super(SourceCode,self).__init__(fileString,lineIndex=lineIndex,bracketTable=bracketTable,**kwargs)
+
+		#The token stream of the file is its bracket table. It is passed along to every piece of the file
+		if not bracketTable:
+			self.bracketTable = TokenStream(self.fileString)
+
+	@property
+	def tokenStream(self):
+		return self.bracketTable
+
+	def findOpenBracket(self,start=0):
+		'''
+		find('{',start) from the token stream
+		'''
+		if len(self.spans) != 1:
+			return self.find('{',start)
+		spanStart,spanEnd = self.spans[0]
+		pos = self.tokenStream.findOpenBracket(spanStart+start,spanEnd)
+		return pos-spanStart if pos != -1 else -1
+
 
 class Mapper(Mapper):
+	def __init__(self,implementation,files,skipMinified=True,**kwargs):
+		'''
+		skipMinified means minified and generated files are not mapped at all
+		Otherwise, only the names of their functions are mapped (see Group._generateNameNodes)
+		'''
+		self.skipMinified = skipMinified
+		super(Mapper,self).__init__(implementation,files,**kwargs)
+
+	def filterFiles(self,files):
+		if not self.skipMinified:
+			return files
+
+		keptFiles = []
+		for filename, fileString in files:
+			reason = getMinifiedReason(fileString)
+			if reason:
+				print "Skipping %s which %s"%(filename,reason)
+			else:
+				keptFiles.append((filename,fileString))
+		return keptFiles
+
 	def generateFileGroup(self,name,source):
 		'''
 		Generate a group for the file. This will be a function group (isFunction=True)
 		A function group can possibly call other groups.
+		Minified files are too costly to take apart so only the names of their functions are mapped
 		'''
+		if source.minifiedReason:
+			print "Only mapping the function names of %s which %s"%(name,source.minifiedReason)
+			return Group(name=name,source=source,fullSource=source,isFunction=False,namesOnly=True)
 		return Group(name=name,source=source,fullSource=source,isFunction=True)
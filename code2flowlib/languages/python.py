@@ -7,15 +7,139 @@ Functions that begin with an "_" are local and do not replace anything in engine
 from code2flowlib.engine import *
 
 indentPattern = re.compile(r"^([\t ]*)\S",re.MULTILINE)
-def getIndent(colonPos,sourceString):
-	try:
-		return indentPattern.search(sourceString[colonPos:]).group(1)
-	except:
-		pdb.set_trace()
+
+defPattern = re.compile(r"def\s(\w+)\s*\(.*?\)\s*\:",re.DOTALL)
+classPattern = re.compile(r"class\s(\w+)\s*(\(.*?\))?\s*\:")
+lineContentPattern = re.compile(r"^[\t ]*[^\t \n]",re.MULTILINE)
+indentAfterColonPattern = re.compile(r"([\t ]*)\S")
+def generateBlockOutline(fileString):
+	'''
+	Find every def and class block in the cleaned file in a single pass over its lines
+
+	A stack of the blocks which are still open is kept while walking forward
+	A block closes at the first non-blank line which does not start with its indent
+	A def or class line at the indent of an open block is a child of that block and opens a block of its own
+
+	Every block is a dict with where its definition, body and end are in the file
+	Groups cut their nodes and subgroups out of their own source from these (see Group._blockSources)
+
+	Returns the module block whose children are the top level defs and classes
+	'''
+	module = {'kind':'module','indent':'','bodyStart':0,'children':[]}
+	openBlocks = [module]
+
+	for lineMatch in lineContentPattern.finditer(fileString):
+		lineStart = lineMatch.start()
+
+		#lines of nothing but whitespace never close anything
+		if fileString[lineMatch.end()-1].isspace():
+			lineEnd = fileString.find('\n',lineStart)
+			if lineEnd == -1:
+				lineEnd = len(fileString)
+			if not nonWhitespacePattern.search(fileString,lineStart,lineEnd):
+				continue
+
+		#pop every block this line is not indented under
+		stillOpen = []
+		for block in openBlocks:
+			if lineStart < block['bodyStart'] or fileString.startswith(block['indent'],lineStart):
+				stillOpen.append(block)
+			else:
+				block['closePos'] = lineStart
+		openBlocks = stillOpen
+
+		#is this line a definition inside of one of the open blocks
+		newBlock = None
+		for block in openBlocks:
+			if lineStart < block['bodyStart']:
+				continue
+			definitionPos = lineStart+len(block['indent'])
+			if not newBlock:
+				newBlock = _generateBlock(fileString,lineStart,definitionPos)
+			if newBlock and newBlock['definitionPos'] == definitionPos:
+				block['children'].append(newBlock)
+
+		if newBlock and newBlock['firstNewline'] != -1:
+			openBlocks.append(newBlock)
+
+	return module
+
+def _generateBlock(fileString,lineStart,definitionPos):
+	'''
+	If a def or class begins at definitionPos, return its block
+	'''
+	if fileString.startswith('def',definitionPos):
+		kind = 'def'
+		match = defPattern.match(fileString,definitionPos)
+	elif fileString.startswith('class',definitionPos):
+		kind = 'class'
+		match = classPattern.match(fileString,definitionPos)
+	else:
+		return None
+	if not match:
+		return None
+
+	colonPos = match.end()
+	firstNewline = fileString.find('\n',colonPos)
+
+	#the indent of the body is that of the first code after the colon:
+	#the indent before the code on the line of the colon (a one line block) or else the indent of the next line with code
+	indentMatch = indentAfterColonPattern.match(fileString,colonPos)
+	if not indentMatch and firstNewline != -1:
+		indentMatch = indentPattern.search(fileString,firstNewline+1)
+
+	return {
+		'kind':kind
+		,'name':match.group(1)
+		,'definitionString':fileString[lineStart:colonPos]
+		,'lineStart':lineStart
+		,'definitionPos':definitionPos
+		,'namePos':match.start(1)
+		,'colonPos':colonPos
+		,'colonLineStart':fileString.rfind('\n',0,colonPos)+1
+		,'firstNewline':firstNewline
+		,'bodyStart':firstNewline+1
+		,'indent':indentMatch.group(1) if indentMatch else ''
+		,'closePos':None
+		,'children':[]
+		}
+
+#An import statement at the start of a line. group(1) is the module of a from import and group(2) is everything which is imported
+#The imported names run until the end of the line, a semicolon, or the closing parenthesis and can be continued with a backslash
+importStatementPattern = re.compile(r"^[\t ]*(?:from\s+([\w.]+)\s+)?import\b[\t ]*(\([^)]*\)|(?:[^\n;\\]|\\\n)+)",re.MULTILINE)
+def generateImportTable(fileString):
+	'''
+	Find every import statement in the cleaned file once
+
+	Returns a dict with:
+		modules: the name which each imported module is used by in this file
+			import a.b       -> {'a.b':'a.b'}
+			import a.b as c  -> {'a.b':'c'}
+		symbols: the names imported from each module. '*' for everything
+			from a import b, c as d  -> {'a':set(['b','c'])}
+	'''
+	modules = {}
+	symbols = {}
+	for match in importStatementPattern.finditer(fileString):
+		fromModule = match.group(1)
+		imported = match.group(2).replace('\\\n',' ').strip('() \t\n')
+		for name in imported.split(','):
+			words = name.split()
+			if len(words) == 3 and words[1] == 'as':
+				name, localName = words[0], words[2]
+			elif len(words) == 1:
+				name = localName = words[0]
+			else:
+				continue
+
+			if fromModule:
+				symbols.setdefault(fromModule,set()).add(name)
+			else:
+				modules.setdefault(name,localName)
+	return {'modules':modules,'symbols':symbols}
 
 class Node(Node):
 	sameScopeKeyword = 'self'
-	namespaceBeforeDotPattern = re.compile(r'(?:[^\w\.]|\A)([\w\.]+)\.$',re.MULTILINE)
 
 	def generateSameScopePatterns(self):
 		patterns = super(Node,self).generateSameScopePatterns()
@@ -30,22 +154,28 @@ class Node(Node):
 		#	pattern = re.compule(r"\Wstr\(\s*%s\s*\)"%self.
 		return patterns
 
+	def getCallNames(self):
+		'''
+		__init__ is called by instantiating the class e.g. MyClass()
+		'''
+		callNames = super(Node,self).getCallNames()
+		if self.isInitNode:
+			callNames.append(self.parent.name)
+		return callNames
+
 	def determineNodeType(self):
 		if self.name == '__init__':
 			self.isInitNode = True
 		else:
 			self.isInitNode = False
 
-	def isExtraneous(self,edges):
+	def isExtraneous(self):
 		'''
 		Returns whether we can safely delete this node
+		A module frame is deleted when nothing calls it and it calls nothing
 		'''
 		if self.isRoot():
-			for edge in edges:
-				if edge.node0 == self or edge.node1 == self:
-					return False
-			else:
-				return True
+			return not (self.inDegree or self.outDegree)
 		return False
 
 	def isRoot(self):
@@ -54,23 +184,34 @@ class Node(Node):
 		else:
 			return True
 
+	def _getImportedName(self):
+		'''
+		The name another file has to import to call this node
+		Either the name of this function or the name of the outermost class it is in
+		'''
+		importedName = self.name
+		group = self.parent
+		while group.parent:
+			importedName = group.name
+			group = group.parent
+		return importedName
+
 	def linksTo(self,other):
 
 		importNamespace = ''
 
 		#If this is in a different file, figure out what namespace to use
+		#The file must import the module of the other node or the name at the top of its namespace from that module
 		if self._getFileGroup() != other._getFileGroup():
-			importPaths = other.parent.getImportPaths(self._getFileName())
-
-			for importPath in importPaths:
-				regularImport = re.compile(r"^import\s+%s\s*$"%re.escape(importPath),re.MULTILINE)
-				complexImport = re.compile('^from\s%s\simport\s(?:\*|(?:.*?\W%s\W.*?))\s*$'%(re.escape(importPath),re.escape(other.name)),re.MULTILINE)
-				#print importPath
-				#print self.parent._getFileGroup().name
-				if regularImport.search(self._getFileGroup().source.sourceString):
-					importNamespace += importPath
+			importTable = self._getFileGroup().importTable
+			importedName = other._getImportedName()
+
+			for importPath in other._getFileGroup().getImportPaths(self._getFileName()):
+				if importPath in importTable['modules']:
+					importNamespace += importTable['modules'][importPath]
 					break
-				elif complexImport.search(self._getFileGroup().source.sourceString):
+				importedNames = importTable['symbols'].get(importPath,())
+				if '*' in importedNames or importedName in importedNames:
 					break
 			else:
 				return False
@@ -78,11 +219,11 @@ class Node(Node):
 		if not other.isRoot():
 			importNamespace = importNamespace + '.' + other.parent.name if importNamespace else other.parent.name
 
-		#If the naive functionName (e.g. \Wmyfunc\( ) appears anywhere in this sourceString, check whether it is actually THAT function
-		match = other.pattern.search(self.source.sourceString)
-		if match:
-			matchPos = match.start(1)
-			hasDot = self.source.sourceString[matchPos-1] == '.'
+		#If the naive functionName (e.g. myfunc()) is called anywhere in this source, check whether it is actually THAT function
+		callSites = self.callSites.get(other.name)
+		if callSites:
+			characterPos, chain = callSites[0]
+			hasDot = bool(chain)
 
 			#if the other function is in the global namespace and this call is not referring to any namespace, return true
 			if other.isRoot() and not hasDot: #TODO js will require the 'window' namespace integrated somehow
@@ -91,15 +232,10 @@ class Node(Node):
 			#if the other is part of a namespace and we are looking for a namspace
 			if hasDot:
 
-				#try finding the namespace of the called object
-				try:
-					prefixSearchLine = self.source.sourceString[:matchPos].split('\n')[-1]
-					#print '"%s"'%prefixSearchLine
-					namespace = self.namespaceBeforeDotPattern.search(prefixSearchLine).group(1)
-				except AttributeError:
-					#will not find a namespace if the object is in an array or something else weird
-					#fall through this function because we can still check for init node
-					namespace = None
+				#the namespace of the called object is the call chain without the trailing dot
+				#will not find a namespace if the object is in an array or something else weird
+				#fall through this function because we can still check for init node
+				namespace = chain[:-1] or None
 
 				#If the namespaces are the same, that is a match
 				if namespace == importNamespace:# and self._getFileGroup() == other._getFileGroup(): #+ other.name
@@ -110,89 +246,118 @@ class Node(Node):
 					return True
 
 				#If a new object was created prior to this call and that object calls this function, that is a match
-				newObjectMatch = other.parent.newObjectAssignedPattern.search(self.source.sourceString)
+				newObjectMatch = other.parent.newObjectAssignedPattern.search(self.source.sourceBuffer)
+				countProfile('regexSearches')
 				if newObjectMatch and namespace == importNamespace + newObjectMatch.group(1):
 					return True
 
 
 		#TODO put in try in case isInitNode not defined
-		if other.isInitNode and other.parent.newObjectPattern.search(self.source.sourceString):
+		if other.isInitNode and other.parent.name in self.callSites:
 			return True
 
 		return False
 
 class Edge(Edge):
-	pass
+	__slots__ = ()
 
 class Group(Group):
 
-	classPattern = re.compile(r"^class\s(\w+)\s*(\(.*?\))?\s*\:",re.MULTILINE)
 	#implicitName = 'module'
 
 	globalFrameName = 'module'
 
-	def __init__(self,indent='',**kwargs):
+	def __init__(self,indent='',block=None,**kwargs):
 		'''
 		Generate a new group
 
 		The only thing special about groups in python is they are delimited by indent
 		This makes things a little bit easier
+
+		The file group finds every block of the file at once. Class groups are passed their own block
 		'''
 		self.indent = indent
 
 		super(Group,self).__init__(**kwargs)
 
-		#If this is the root node, set indent to nothing
-		#if not self.parent:
-		#	self.indent = ''
+		#If this is the root node, outline the whole file and find what it imports
+		if not self.parent:
+			block = generateBlockOutline(self.source.fileString)
+			self.importTable = generateImportTable(self.source.fileString)
+			self.importPaths = {}
 
-		#with the indent set, we can now generate nodes
-		self._generateNodes()
+		#with the outline, we can now generate nodes
+		self._generateNodes(block)
 
 		#If this is the root node, continue generating subgroups and nodes
 		if not self.parent:
-			self.generateSubgroups()
+			self.generateSubgroups(block)
 			self.nodes.append(self.generateRootNode())
 
 	def trimGroups(self):
 		pass
 
-	def _generateNodes(self):
+	def _generateNodes(self,block):
 		'''
-		Find all function definitions, generate the nodes, and append them
+		Generate a node for every function defined directly in this group and append them
+		Like finding them with a regex, a def inside of the definition line of the previous def is skipped
 		'''
-		functionPatterns = self.generateFunctionPatterns()
-		for pattern in functionPatterns:
-			functionMatches = pattern.finditer(self.source.sourceString)
-			for functionMatch in functionMatches:
-				node = self.generateNode(functionMatch)
+		definitionEnd = 0
+		for childBlock in block['children']:
+			if childBlock['kind'] != 'def' or childBlock['lineStart'] < definitionEnd:
+				continue
+			node = self.generateNode(childBlock)
+			if node:
 				self.nodes.append(node)
+				definitionEnd = childBlock['colonPos']
+
+	def generateSubgroups(self,block):
+		for childBlock in block['children']:
+			if childBlock['kind'] != 'class':
+				continue
+			sources = self._blockSources(childBlock)
+			if not sources:
+				continue
+			source, fullSource = sources
+			name = childBlock['name']
+			definitionString = childBlock['definitionString']
+			lineNumber = self.source.getLineNumber(childBlock['colonPos']-self.source.spans[0][0])
+			classGroup = Group(name=name,definitionString=definitionString,indent=childBlock['indent'],source=source,fullSource=fullSource,parent=self,lineNumber=lineNumber,block=childBlock)
+			self.subgroups.append(classGroup)
 
-	def generateFunctionPatterns(self):
+	def _blockSources(self,block):
 		'''
-		Return the regex for function definition at this indent level
+		Cut the source (after the colon) and the full source (from the definition line) of a block out of this group's source
+		Returns None if the definition does not fit inside of this group's source
+
+		The source runs until the line which closed the block or until the end of this group's source, whichever is first
+		The end is the colon plus the length of the body lines. It is counted from the colon and not from the end of the colon's line
+		so it stops short of the closing line by the rest of the colon's line. Sources have always been cut this way
+		A block whose colon is on the last line of this group's source is empty
 		'''
-		indent = self.indent.replace(' ',r'\s').replace('	',r'\t')
-		return [re.compile(r"^%sdef\s(\w+)\s*\(.*?\)\s*\:"%indent,re.MULTILINE|re.DOTALL)]
-
-	def generateSubgroups(self):
-		classMatches = self.classPattern.finditer(self.source.sourceString)
-		for classMatch in classMatches:
-			name = classMatch.group(1)
-			definitionString = classMatch.group(0)
-			colonPos = classMatch.end(0)
-			indent = getIndent(colonPos=colonPos,sourceString=self.source.sourceString)
-			source = self.source.getSourceInBlock(colonPos=colonPos)
-			fullSource = self.source.getSourceInBlock(colonPos=colonPos,fullSource=True)
-			lineNumber = self.source.getLineNumber(colonPos)
-			classGroup = Group(name=name,definitionString=definitionString,indent=indent,source=source,fullSource=fullSource,parent=self,lineNumber=lineNumber)
-			self.subgroups.append(classGroup)
+		viewStart,viewEnd = self.source.spans[0]
+		if block['lineStart'] < viewStart or block['colonPos'] > viewEnd:
+			return None
+
+		colonPos = block['colonPos']
+		firstNewline = block['firstNewline']
+		if firstNewline == -1 or firstNewline >= viewEnd:
+			endPos = colonPos
+		elif block['closePos'] is not None and block['closePos'] < viewEnd:
+			endPos = colonPos+block['closePos']-firstNewline-1
+		else:
+			endPos = colonPos+viewEnd-firstNewline
+
+		startPos = max(block['colonLineStart'],viewStart)
+		source = self.source[colonPos+1-viewStart:endPos-viewStart]
+		fullSource = self.source[startPos-viewStart:endPos-viewStart]
+		return source, fullSource
 
 	def generateNewObjectPattern(self):
-		return re.compile(r'%s\s*\('%self.name)
+		return compilePattern(r'%s\s*\('%self.name)
 
 	def generateNewObjectAssignedPattern(self):
-		return re.compile(r'(\w)\s*=\s*%s\s*\('%self.name)
+		return compilePattern(r'(\w)\s*=\s*%s\s*\('%self.name)
 
 	def generateRootNode(self):
 		name = self._generateRootNodeName()
@@ -203,30 +368,17 @@ class Group(Group):
 		'''
 		Find all of the code not in any subnode, string it together, and return it as the implicit node
 		'''
-
-		source = self.source.copy()
-		for node in self.nodes:
-			source -= node.fullSource
-
-			#source =source.remove(node.definitionString)
-
-		for group in self.subgroups:
-			source -= group.fullSource
-			'''
-			source.remove(group.source.sourceString)
-			if group.definitionString:
-				#print group.definitionString
-
-				source = source.remove(group.definitionString)
-			'''
-		return source
+		childSources = [node.fullSource for node in self.nodes]+[group.fullSource for group in self.subgroups]
+		return self.source.subtract(childSources)
 
 	def getImportPaths(self,importerFilename):
 		'''
 		Return the relative and absolute paths the other filename would use to import this module
+		The paths are remembered for each importer because every node of the importer asks again
 		'''
-		paths = self._getRelativeImportPaths(importerFilename)+self._getAbsoluteImportPaths()
-		return paths
+		if importerFilename not in self.importPaths:
+			self.importPaths[importerFilename] = self._getRelativeImportPaths(importerFilename)+self._getAbsoluteImportPaths()
+		return self.importPaths[importerFilename]
 
 
 	def _getRelativeImportPaths(self,importerFilename):
@@ -280,23 +432,25 @@ class Group(Group):
 
 		return paths
 
-	def generateNode(self,reMatch):
+	def generateNode(self,block):
 		'''
-		Using the name match, generate the name, source, and parent of this node
+		Using the block of a def, generate the name, source, and parent of this node
+		Returns None if the def does not fit inside of this group's source
 
-		group(0) is the entire definition line ending at the new block delimiter like:
+		definitionString is the entire definition line ending at the new block delimiter like:
 			def myFunction(a,b,c):
-		group(1) is the identifier name like:
+		name is the identifier name like:
 			myFunction
 		'''
-		name = reMatch.group(1)
-		definitionString = reMatch.group(0)
+		sources = self._blockSources(block)
+		if not sources:
+			return None
+		source, fullSource = sources
 
-		newBlockDelimPos = reMatch.end(0)
-		beginIdentifierPos = reMatch.start(1)
+		name = block['name']
+		definitionString = block['definitionString']
+		beginIdentifierPos = block['namePos']-self.source.spans[0][0]
 
-		source = self.source.getSourceInBlock(newBlockDelimPos)
-		fullSource = self.source.getSourceInBlock(newBlockDelimPos,fullSource=True)
 		lineNumber = self.source.getLineNumber(beginIdentifierPos)
 		return Node(name=name,definitionString=definitionString,source=source,fullSource=fullSource,parent=self,characterPos=beginIdentifierPos,lineNumber=lineNumber)
 
@@ -310,34 +464,6 @@ class SourceCode(SourceCode):
 		]
 	inlineComments = "#"
 
-	def getSourceInBlock(self,colonPos,fullSource=False):
-		'''
-		Overwrites superclass method
-		'''
-		indent = getIndent(colonPos,self.sourceString)
-
-		endPos = colonPos
-
-		lines = self.sourceString[colonPos:].split('\n')[1:]
-		for line in lines:
-			if line.startswith(indent) or line.strip()=='':
-				endPos += len(line)+1 #+1 for the newlines lost
-			else:
-				break
-
-		if fullSource:
-			startPos = self.sourceString.rfind('\n',0,colonPos)
-			if startPos == -1:
-				startPos = 0
-			else:
-				startPos += 1
-		else:
-			startPos = colonPos+1
-		try:
-			return self[startPos:endPos]
-		except:
-			pdb.set_trace()
-
 
 class Mapper(Mapper):
 
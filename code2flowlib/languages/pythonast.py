@@ -0,0 +1,310 @@
+'''
+Python with the abstract syntax tree of the standard library instead of regexes
+
+All of these classes subclass python.py classes. Only how files are outlined is different:
+compile(...,ast.PyCF_ONLY_AST) parses the whole file in C and one walk over the tree finds
+the classes, functions, call sites, returns and imports. Comments and strings do not have to be removed
+
+The groups and nodes are the same as the ones python.py makes so linking and everything after is shared:
+	the file group has a node for every top level function and the module frame
+	every top level class is a subgroup with a node for every method
+
+Files which do not parse (e.g. python 3 only syntax) are mapped by python.py instead
+
+Functions that begin with an "_" are local and do not replace anything in python.py or engine.py
+'''
+
+import ast
+
+from code2flowlib.languages import python
+from code2flowlib.languages.python import *
+
+#Where the body of a block begins
+colonPattern = re.compile(r"\s*:")
+
+class Group(Group):
+	def __init__(self,statements=None,indent='',**kwargs):
+		'''
+		Generate a new group from the statements of the module or of a class
+		python.Group.__init__ is skipped because that is where the regexes outline the file
+		'''
+		self.indent = indent
+		super(python.Group,self).__init__(**kwargs)
+		if self.parent:
+			return
+
+		lineStarts = self.source.lineIndex.lineStarts
+		rootScan = _Scan()
+		imports = []
+
+		#I. Find the blocks and scan everything in one walk. Decorators and default arguments belong to the frame the block is defined in
+		defs = []
+		classes = []
+		for statement in statements:
+			if isinstance(statement,ast.FunctionDef):
+				defScan = _Scan()
+				_scanTree(statement.decorator_list+statement.args.defaults,rootScan,imports,lineStarts)
+				_scanTree(statement.body,defScan,imports,lineStarts)
+				defs.append((statement,defScan))
+			elif isinstance(statement,ast.ClassDef):
+				_scanTree(statement.decorator_list+statement.bases,rootScan,imports,lineStarts)
+				methods = []
+				for classStatement in statement.body:
+					if isinstance(classStatement,ast.FunctionDef):
+						methodScan = _Scan()
+						_scanTree(classStatement.decorator_list+classStatement.args.defaults,None,imports,lineStarts)
+						_scanTree(classStatement.body,methodScan,imports,lineStarts)
+						methods.append((classStatement,methodScan))
+					else:
+						#Like python.py, classes have no frame so calls in their bodies are not kept
+						_scanTree([classStatement],None,imports,lineStarts)
+				classes.append((statement,methods))
+			else:
+				_scanTree([statement],rootScan,imports,lineStarts)
+
+		self.importTable = _generateImportTable(imports)
+		self.importPaths = {}
+
+		#II. Make the nodes and groups in the same order python.py does so that the UIDs are the same
+		blockEnds = _generateBlockEnds(statements,lineStarts,len(self.source.fileString))
+		for statement, defScan in defs:
+			self.nodes.append(self._generateNode(statement,blockEnds[statement],defScan))
+		for statement, methods in classes:
+			self.subgroups.append(self._generateClassGroup(statement,blockEnds[statement],methods))
+		self.nodes.append(self.generateRootNode(rootScan))
+
+	def _generateNode(self,statement,blockEnd,scan):
+		header = _findHeader(self.source.fileString,statement,self.source.lineIndex.lineStarts,'def')
+		definitionStart, namePos, colonPos = header
+		source, fullSource = self._generateBlockSources(colonPos,blockEnd)
+		definitionString = self.source.fileString[definitionStart:colonPos]
+		characterPos = namePos-self.source.spans[0][0]
+		return Node(name=statement.name,definitionString=definitionString,source=source,fullSource=fullSource,parent=self,characterPos=characterPos,lineNumber=self.source.lineIndex.getLineNumber(namePos),callSites=scan.callSites,returns=scan.returns)
+
+	def _generateClassGroup(self,statement,blockEnd,methods):
+		lineStarts = self.source.lineIndex.lineStarts
+		definitionStart, namePos, colonPos = _findHeader(self.source.fileString,statement,lineStarts,'class')
+		source, fullSource = self._generateBlockSources(colonPos,blockEnd)
+		classGroup = Group(name=statement.name,definitionString=self.source.fileString[definitionStart:colonPos],indent=_getBodyIndent(self.source.fileString,statement,lineStarts),source=source,fullSource=fullSource,parent=self,lineNumber=self.source.lineIndex.getLineNumber(colonPos))
+
+		methodEnds = _generateBlockEnds(statement.body,lineStarts,blockEnd)
+		for method, methodScan in methods:
+			classGroup.nodes.append(classGroup._generateNode(method,methodEnds[method],methodScan))
+		return classGroup
+
+	def _generateBlockSources(self,colonPos,blockEnd):
+		'''
+		The source after the colon and the full source from the line of the colon until the end of the block
+		Positions are in the file. This group's source always starts at the start of the file or after a colon
+		'''
+		viewStart = self.source.spans[0][0]
+		colonLineStart = self.source.fileString.rfind('\n',0,colonPos)+1
+		source = self.source[colonPos-viewStart:blockEnd-viewStart]
+		fullSource = self.source[max(colonLineStart,viewStart)-viewStart:blockEnd-viewStart]
+		return source, fullSource
+
+	def generateRootNode(self,scan):
+		name = self._generateRootNodeName()
+		source = self.generateImplicitNodeSource()
+		return Node(name=name,definitionString=None,source=source,parent=self,callSites=scan.callSites,returns=scan.returns)
+
+class SourceCode(SourceCode):
+	def __init__(self,fileString,lineIndex=None,**kwargs):
+		'''
+		The raw file is parsed here instead of having its comments and strings removed
+		tree is the module of the syntax tree or None when the file does not parse. Then, this is a regular python.py source
+		'''
+		self.tree = None
+		if not lineIndex:
+			try:
+				self.tree = compile(fileString,'<file>','exec',ast.PyCF_ONLY_AST)
+			except (SyntaxError,TypeError,ValueError) as e:
+				self.syntaxError = e
+			else:
+				lineIndex = _generateLineIndex(fileString)
+		super(SourceCode,self).__init__(fileString,lineIndex=lineIndex,**kwargs)
+
+class Mapper(Mapper):
+	def generateFileGroup(self,name,source):
+		'''
+		Generate the file group from the syntax tree or with python.py when the file did not parse
+		'''
+		if source.tree is None:
+			print "Could not parse %s (%s). Using regexes instead"%(name,source.syntaxError)
+			return python.Group(name=name,source=source,indent='')
+
+		#Nothing needs the tree after this and it should not be pickled with the source
+		tree = source.tree
+		source.tree = None
+		return Group(name=name,source=source,statements=tree.body,indent='')
+
+class _Scan(object):
+	'''
+	What was found in the statements of one node
+	callSites is indexed like engine.generateCallSites but a position is where the whole call begins in the file
+	'''
+	def __init__(self):
+		self.callSites = {}
+		self.returns = False
+
+def _scanTree(roots,scan,imports,lineStarts):
+	'''
+	Walk the trees adding every call and return to scan and every import to imports. Without a scan, only imports are found
+
+	Calls are added in the order their names appear in the source like the regexes find them:
+	the function being called is walked before the arguments so a.b(c()).d() is b, c, d
+	Walks with a stack because long expressions nest deeper than the recursion limit
+	'''
+	stack = roots[::-1]
+	while stack:
+		node = stack.pop()
+		nodeType = type(node)
+		if nodeType is tuple:
+			callName, chain, position = node
+			scan.callSites.setdefault(callName,[]).append((position,chain))
+			continue
+
+		if nodeType is ast.Call:
+			children = [node.func]
+			if scan:
+				call = _getCallChain(node.func)
+				if call:
+					children.append(call+(lineStarts[node.lineno-1]+node.col_offset,))
+			children += node.args+[keyword.value for keyword in node.keywords]
+			children += [child for child in (node.starargs,node.kwargs) if child]
+			stack.extend(reversed(children))
+			continue
+
+		if nodeType is ast.Import or nodeType is ast.ImportFrom:
+			imports.append(node)
+			continue
+		if nodeType is ast.Return and scan:
+			scan.returns = True
+
+		children = []
+		for field in _getChildFields(nodeType):
+			child = getattr(node,field)
+			if type(child) is list:
+				children += child
+			elif child is not None:
+				children.append(child)
+		stack.extend(reversed(children))
+
+#The fields of every node type which can hold more nodes. Filled as types are found
+childFields = {}
+
+#Fields which never hold anything with a call, a return or an import in it
+leafFields = frozenset(('ctx','op','n','s','id','name','attr','level','module','names','lineno','col_offset'))
+
+def _getChildFields(nodeType):
+	'''
+	ast.iter_child_nodes looks at every field of every node. This only looks at the ones which can hold nodes
+	Some fields hold a plain value like the bool of print >> f, x, which has no fields
+	'''
+	if nodeType not in childFields:
+		childFields[nodeType] = tuple(field for field in getattr(nodeType,'_fields',()) if field not in leafFields)
+	return childFields[nodeType]
+
+def _getCallChain(func):
+	'''
+	The bare name and the namespace chain before it the way that the call site regex finds them
+	a.b.c() is ('c','a.b.') and a().b() is ('b','.')
+	None when the regex finds nothing e.g. a[0]()
+	'''
+	if isinstance(func,ast.Name):
+		return func.id, ''
+	if not isinstance(func,ast.Attribute):
+		return None
+
+	names = []
+	value = func.value
+	while isinstance(value,ast.Attribute):
+		names.append(value.attr)
+		value = value.value
+	names.append(value.id if isinstance(value,ast.Name) else '')
+	return func.attr, '.'.join(reversed(names))+'.'
+
+def _generateImportTable(imports):
+	'''
+	The same import table as python.generateImportTable from the import statements of the tree
+	'''
+	modules = {}
+	symbols = {}
+	for statement in imports:
+		if isinstance(statement,ast.Import):
+			for alias in statement.names:
+				modules.setdefault(alias.name,alias.asname or alias.name)
+		else:
+			fromModule = '.'*statement.level+(statement.module or '')
+			for alias in statement.names:
+				symbols.setdefault(fromModule,set()).add(alias.name)
+	return {'modules':modules,'symbols':symbols}
+
+def _generateLineIndex(fileString):
+	'''
+	Nothing is removed from the file so every line is where it is in the original file
+	'''
+	lineStarts = [0]
+	position = fileString.find('\n')
+	while position != -1:
+		lineStarts.append(position+1)
+		position = fileString.find('\n',position+1)
+	return LineIndex(lineStarts,range(1,len(lineStarts)+1))
+
+def _generateBlockEnds(statements,lineStarts,end):
+	'''
+	Where every statement ends in the file, which is where the line of the next statement begins
+	The tree has no end positions so the last statement runs until end
+	Decorated functions and classes begin at their first decorator
+	'''
+	blockEnds = {}
+	for statement, nextStatement in zip(statements,statements[1:]):
+		blockEnds[statement] = lineStarts[nextStatement.lineno-1]
+	if statements:
+		blockEnds[statements[-1]] = end
+	return blockEnds
+
+def _findHeader(fileString,statement,lineStarts,keyword):
+	'''
+	Where the def or class line begins, where the name is, and where the colon after the header ends
+	The statement starts at its first decorator so look for the line which starts with the keyword
+	'''
+	lineNumber = statement.lineno
+	while True:
+		definitionStart = lineStarts[lineNumber-1]
+		keywordPos = definitionStart+statement.col_offset
+		if fileString.startswith(keyword,keywordPos) or lineNumber == len(lineStarts):
+			break
+		lineNumber += 1
+
+	namePos = fileString.find(statement.name,keywordPos+len(keyword))
+
+	#The colon is the last thing before the body. Search back for it from the first statement of the body
+	bodyStart = lineStarts[statement.body[0].lineno-1]+statement.body[0].col_offset
+	colonPos = fileString.rfind(':',namePos,bodyStart)
+	if not colonPattern.match(fileString,colonPos) or _isInComment(fileString,colonPos):
+		colonPos = _findColonBefore(fileString,namePos,bodyStart)
+	return definitionStart, namePos, colonPos+1
+
+def _isInComment(fileString,position):
+	lineStart = fileString.rfind('\n',0,position)+1
+	return '#' in fileString[lineStart:position]
+
+def _findColonBefore(fileString,namePos,bodyStart):
+	'''
+	The colon which ends the header when comments after it have colons in them
+	The first colon at the end of a line, ignoring any comment, or right before the body
+	'''
+	for match in re.compile(r":[ \t]*(?:#[^\n]*)?(?:\n|\Z)").finditer(fileString,namePos,bodyStart):
+		return match.start()
+	return fileString.rfind(':',namePos,bodyStart)
+
+def _getBodyIndent(fileString,statement,lineStarts):
+	'''
+	The indent of the first statement of the class body. Empty when the body is on the line of the header
+	'''
+	firstStatement = statement.body[0]
+	if firstStatement.lineno == statement.lineno:
+		return ''
+	lineStart = lineStarts[firstStatement.lineno-1]
+	return fileString[lineStart:lineStart+firstStatement.col_offset]
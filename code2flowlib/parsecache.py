@@ -0,0 +1,126 @@
+'''
+An on-disk cache of parsed files so that unchanged files do not have to be parsed again
+
+Each entry is the outline of one file (see Mapper._generateFileOutline):
+the cleaned source, the line map, and every group and node with its source spans
+
+Entries are keyed by:
+	the content of the file
+	the name of the file (the file group is named after it)
+	the language implementation
+	the version of the engine, which is a fingerprint of the engine and implementation source
+So changing any of those is the same as a cache miss
+
+When the cache grows past maxBytes, the least recently used entries are removed
+
+Wherever the cache directory is, it has a .gitignore which ignores everything in it
+so that entries are never committed and are skipped when a directory which holds the cache is mapped
+'''
+
+import cPickle as pickle
+import hashlib
+import importlib
+import inspect
+import os
+
+DEFAULT_DIRECTORY = '.code2flow-cache'
+DEFAULT_MAX_BYTES = 256*1024*1024
+IGNORE_FILENAME = '.gitignore'
+
+class ParseCache(object):
+	def __init__(self,directory=DEFAULT_DIRECTORY,maxBytes=DEFAULT_MAX_BYTES):
+		self.directory = directory
+		self.maxBytes = maxBytes
+		self.engineVersions = {}
+
+		if not os.path.isdir(self.directory):
+			os.makedirs(self.directory)
+		ignorePath = os.path.join(self.directory,IGNORE_FILENAME)
+		if not os.path.isfile(ignorePath):
+			with open(ignorePath,'w') as outfile:
+				outfile.write('*\n')
+
+	def generateKey(self,filename,fileString,implementationName):
+		'''
+		The hash of everything that would make the outline of this file different
+		'''
+		key = hashlib.sha1()
+		key.update(self._engineVersion(implementationName))
+		key.update('\0'+implementationName+'\0'+filename+'\0')
+		key.update(fileString)
+		return key.hexdigest()
+
+	def get(self,key):
+		'''
+		Return the file outline or None if it is not cached
+		A hit marks the entry as recently used
+		'''
+		path = self._getPath(key)
+		try:
+			with open(path,'rb') as infile:
+				outline = pickle.load(infile)
+		except (IOError,EOFError,pickle.UnpicklingError):
+			return None
+
+		try:
+			os.utime(path,None)
+		except OSError:
+			pass
+		return outline
+
+	def set(self,key,outline):
+		'''
+		Write the file outline. Writes go to a temporary file first so a reader never sees half an entry
+		'''
+		path = self._getPath(key)
+		tmpPath = '%s.%d.tmp'%(path,os.getpid())
+		with open(tmpPath,'wb') as outfile:
+			pickle.dump(outline,outfile,pickle.HIGHEST_PROTOCOL)
+		try:
+			os.rename(tmpPath,path)
+		except OSError:
+			#windows will not rename over an existing file. Somebody else already wrote this entry
+			os.remove(tmpPath)
+
+	def evict(self):
+		'''
+		Remove the least recently used entries until the cache is no larger than maxBytes
+		'''
+		entries = []
+		for entryName in os.listdir(self.directory):
+			if entryName == IGNORE_FILENAME:
+				continue
+			path = os.path.join(self.directory,entryName)
+			try:
+				stat = os.stat(path)
+			except OSError:
+				continue
+			entries.append((stat.st_mtime,stat.st_size,path))
+
+		totalBytes = sum(size for mtime,size,path in entries)
+		for mtime,size,path in sorted(entries):
+			if totalBytes <= self.maxBytes:
+				break
+			try:
+				os.remove(path)
+			except OSError:
+				continue
+			totalBytes -= size
+
+	def _engineVersion(self,implementationName):
+		'''
+		Fingerprint of the engine and implementation source. Changing the parser invalidates the cache
+		Implementations built on another implementation (pythonast.py on python.py) include that one too
+		'''
+		if implementationName not in self.engineVersions:
+			fingerprint = hashlib.sha1()
+			implementation = importlib.import_module(implementationName)
+			moduleNames = set(cls.__module__ for cls in inspect.getmro(implementation.Group) if cls.__module__.startswith('code2flowlib.'))
+			moduleNames.update(('code2flowlib.engine',implementationName))
+			for moduleName in sorted(moduleNames):
+				fingerprint.update(inspect.getsource(importlib.import_module(moduleName)))
+			self.engineVersions[implementationName] = fingerprint.hexdigest()
+		return self.engineVersions[implementationName]
+
+	def _getPath(self,key):
+		return os.path.join(self.directory,key)
@@ -0,0 +1,119 @@
+'''
+Time the phases of a run and count what happened in them
+
+The engine reports to the profile passed to engine.setProfile
+Without one, nothing is timed or counted
+
+Phases are timed with the highest resolution timer available and are not nested
+so the seconds of all of the phases add up to the time of the run:
+	read: reading the files
+	cache: looking files up in the parse cache and rebuilding the ones which were found
+	parse: parsing files in a process pool (with --jobs). The strip and groups of those files happen in the workers
+	strip: removing comments and strings
+	groups: finding the groups and nodes of every file
+	trim: trimming groups and extraneous nodes
+	edges: finding which nodes call which
+	write: generating the DOT text and writing it out, including to graphviz
+	render: waiting for graphviz to finish after all of the DOT text was written
+'''
+
+import json
+import timeit
+
+#Counters are printed in this order. Any other counter is printed after these
+COUNTERS = ('files','droppedFiles','bytes','bytesStripped','tokens','cacheHits','cacheMisses','groups','nodes','linksToCalls','regexSearches','edges')
+
+class Profile(object):
+	def __init__(self):
+		self.phaseNames = []
+		self.seconds = {}
+		self.calls = {}
+		self.counters = {}
+
+	def phase(self,name):
+		'''
+		Time everything in a with block as part of the phase with this name
+		'''
+		return _Phase(self,name)
+
+	def addTime(self,name,seconds):
+		if name not in self.seconds:
+			self.phaseNames.append(name)
+			self.seconds[name] = 0.0
+			self.calls[name] = 0
+		self.seconds[name] += seconds
+		self.calls[name] += 1
+
+	def count(self,name,amount=1):
+		self.counters[name] = self.counters.get(name,0)+amount
+
+	def takeCounters(self):
+		'''
+		Return the counters and start counting from zero again
+		Process pool workers send these to the parent which adds them to its own profile
+		'''
+		counters = self.counters
+		self.counters = {}
+		return counters
+
+	def addCounters(self,counters):
+		for name, amount in counters.items():
+			self.count(name,amount)
+
+	def toDict(self):
+		return {
+			'totalSeconds':sum(self.seconds.values())
+			,'phases':[{'name':name,'seconds':self.seconds[name],'calls':self.calls[name]} for name in self.phaseNames]
+			,'counters':self.counters
+			}
+
+	def writeJson(self,path):
+		with open(path,'w') as outfile:
+			json.dump(self.toDict(),outfile,indent=1,sort_keys=True)
+			outfile.write('\n')
+
+	def generateReport(self):
+		'''
+		The phases and counters as a table
+		'''
+		totalSeconds = sum(self.seconds.values())
+		lines = ['%-16s %10s %7s %8s'%('phase','seconds','share','calls')]
+		for name in self.phaseNames:
+			share = self.seconds[name]/totalSeconds if totalSeconds else 0.0
+			lines.append('%-16s %10.4f %6.1f%% %8d'%(name,self.seconds[name],share*100,self.calls[name]))
+		lines.append('%-16s %10.4f'%('total',totalSeconds))
+		lines.append('')
+		lines.append('%-16s %10s'%('counter','value'))
+		names = [name for name in COUNTERS if name in self.counters]
+		names += sorted(name for name in self.counters if name not in COUNTERS)
+		for name in names:
+			lines.append('%-16s %10d'%(name,self.counters[name]))
+		return '\n'.join(lines)
+
+def timePhase(profile,name):
+	'''
+	profile.phase(name) or, without a profile, a with block which does nothing
+	'''
+	if profile:
+		return profile.phase(name)
+	return _noPhase
+
+class _NoPhase(object):
+	def __enter__(self):
+		pass
+
+	def __exit__(self,excType,excValue,traceback):
+		pass
+
+_noPhase = _NoPhase()
+
+class _Phase(object):
+	def __init__(self,profile,name):
+		self.profile = profile
+		self.name = name
+
+	def __enter__(self):
+		self.start = timeit.default_timer()
+
+	def __exit__(self,excType,excValue,traceback):
+		self.profile.addTime(self.name,timeit.default_timer()-self.start)
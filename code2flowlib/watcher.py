@@ -0,0 +1,44 @@
+'''
+Watch source files for changes by polling their modification times and sizes
+
+No extra services are needed. Every interval, each file is stat'ed and
+the files whose (mtime,size) changed since the last poll are reported
+A file which is deleted is reported once as changed and again if it comes back
+'''
+
+import os
+import time
+
+class FileWatcher(object):
+	def __init__(self,filenames,interval=1.0):
+		self.interval = interval
+		self.signatures = dict((filename,self._getSignature(filename)) for filename in filenames)
+
+	def poll(self):
+		'''
+		Return the files which changed since the last poll
+		'''
+		changed = []
+		for filename, signature in self.signatures.items():
+			newSignature = self._getSignature(filename)
+			if newSignature != signature:
+				self.signatures[filename] = newSignature
+				changed.append(filename)
+		return sorted(changed)
+
+	def watch(self):
+		'''
+		Yield the list of changed files every time something changes. Never returns
+		'''
+		while True:
+			time.sleep(self.interval)
+			changed = self.poll()
+			if changed:
+				yield changed
+
+	def _getSignature(self,filename):
+		try:
+			stat = os.stat(filename)
+		except OSError:
+			return None
+		return (stat.st_mtime,stat.st_size)
@@ -0,0 +1,72 @@
+'''
+The benchmark suite flags the cases which are slower or larger than the baseline and nothing else
+'''
+
+import imp
+import json
+import os
+import unittest
+
+from tests.util import quiet
+
+run = imp.load_source('benchmarksRun',os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),'benchmarks','run.py'))
+
+def generateResults(**cases):
+	'''
+	Results like the ones measureCase makes from {name:(wallSeconds,peakRssKB)}
+	'''
+	results = {'cases':{}}
+	for name, (wallSeconds,peakRssKB) in cases.items():
+		results['cases'][name] = {'wallSeconds':wallSeconds,'peakRssKB':peakRssKB,'phases':{},'nodes':10,'edges':5}
+	return results
+
+class TestCompare(unittest.TestCase):
+	def compare(self,results,baseline,timeThreshold=0.25,rssThreshold=0.25,minSeconds=0.05):
+		with quiet():
+			return run.compare(results,baseline,timeThreshold,rssThreshold,minSeconds)
+
+	def testSame(self):
+		baseline = generateResults(a=(1.0,1000),b=(0.5,2000))
+		self.assertEqual(self.compare(baseline,baseline),[])
+
+	def testFaster(self):
+		self.assertEqual(self.compare(generateResults(a=(0.5,500)),generateResults(a=(1.0,1000))),[])
+
+	def testSlower(self):
+		baseline = generateResults(a=(1.0,1000))
+		self.assertEqual(self.compare(generateResults(a=(1.2,1000)),baseline),[])
+		self.assertEqual(self.compare(generateResults(a=(1.3,1000)),baseline),['a is +30% slower'])
+		self.assertEqual(self.compare(generateResults(a=(1.3,1000)),baseline,timeThreshold=0.5),[])
+
+	def testMinSeconds(self):
+		'''
+		Tiny cases are mostly noise
+		'''
+		baseline = generateResults(a=(0.01,1000))
+		self.assertEqual(self.compare(generateResults(a=(0.05,1000)),baseline),[])
+		self.assertEqual(self.compare(generateResults(a=(0.07,1000)),baseline),['a is +600% slower'])
+
+	def testLarger(self):
+		baseline = generateResults(a=(1.0,1000))
+		self.assertEqual(self.compare(generateResults(a=(1.0,1200)),baseline),[])
+		self.assertEqual(self.compare(generateResults(a=(1.0,1300)),baseline),['a uses +30% more memory'])
+		self.assertEqual(self.compare(generateResults(a=(1.0,1300)),baseline,rssThreshold=0.5),[])
+
+	def testMissing(self):
+		'''
+		Cases which are not in the baseline and memory which could not be measured are not compared
+		'''
+		self.assertEqual(self.compare(generateResults(a=(9.0,9000)),generateResults(b=(1.0,1000))),[])
+		self.assertEqual(self.compare(generateResults(a=(1.0,None)),generateResults(a=(1.0,1000))),[])
+		self.assertEqual(self.compare(generateResults(a=(1.0,None)),generateResults(a=(1.0,None))),[])
+
+class TestBaseline(unittest.TestCase):
+	def testEveryCase(self):
+		with open(run.DEFAULT_BASELINE) as infile:
+			baseline = json.load(infile)
+		self.assertEqual(sorted(baseline['cases']),sorted(name for name,case in run.CASES))
+		for name, result in baseline['cases'].items():
+			self.assertEqual(sorted(result['phases']),sorted(run.PHASES),name)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,83 @@
+'''
+Brackets are matched the same with numpy and with the stack which is used without it
+'''
+
+import random
+import unittest
+
+from tests.util import JS_SCRIPTS
+
+from code2flowlib import engine
+
+def matchByCounting(string,openBracket='{',closeBracket='}'):
+	'''
+	Count forward from every open bracket until it is closed
+	'''
+	matches = {}
+	for openPosition, character in enumerate(string):
+		if character != openBracket:
+			continue
+		depth = 0
+		for position in range(openPosition,len(string)):
+			if string[position] == openBracket:
+				depth += 1
+			elif string[position] == closeBracket:
+				depth -= 1
+				if not depth:
+					matches[openPosition] = position
+					break
+	return matches
+
+def findBrackets(string):
+	return [i for i,c in enumerate(string) if c == '{'], [i for i,c in enumerate(string) if c == '}']
+
+def generateBracketStrings(count,seed=0):
+	'''
+	Random strings of brackets and other characters. Many of them have brackets which are never closed or never opened
+	'''
+	generator = random.Random(seed)
+	for i in range(count):
+		length = generator.randint(0,60)
+		yield ''.join(generator.choice('{{}}a ') for j in range(length))
+
+class TestMatchBrackets(unittest.TestCase):
+	def testStack(self):
+		for string in generateBracketStrings(2000):
+			self.assertEqual(engine._matchBracketsWithStack(*findBrackets(string)),matchByCounting(string),string)
+
+	@unittest.skipUnless(engine.numpy,'numpy is not installed')
+	def testNumpy(self):
+		for string in generateBracketStrings(2000):
+			self.assertEqual(engine._matchBracketsWithNumpy(*findBrackets(string)),matchByCounting(string),string)
+
+	@unittest.skipUnless(engine.numpy,'numpy is not installed')
+	def testTestscripts(self):
+		for filename in JS_SCRIPTS:
+			with open(filename) as fi:
+				brackets = findBrackets(fi.read())
+			self.assertEqual(engine._matchBracketsWithNumpy(*brackets),engine._matchBracketsWithStack(*brackets),filename)
+
+class TestBracketTable(unittest.TestCase):
+	def testBracketTable(self):
+		for string in generateBracketStrings(500,seed=1):
+			expected = matchByCounting(string)
+			bracketTable = engine.BracketTable(string,'{','}')
+			for position in range(len(string)):
+				self.assertEqual(bracketTable.getClosePosition(position),expected.get(position,-1))
+
+	@unittest.skipUnless(engine.numpy,'numpy is not installed')
+	def testWithoutNumpy(self):
+		numpy = engine.numpy
+		engine.numpy = None
+		try:
+			for string in generateBracketStrings(500,seed=2):
+				expected = matchByCounting(string)
+				bracketTable = engine.BracketTable(string,'{','}')
+				self.assertEqual(bracketTable._findBrackets(),findBrackets(string))
+				for position in range(len(string)):
+					self.assertEqual(bracketTable.getClosePosition(position),expected.get(position,-1))
+		finally:
+			engine.numpy = numpy
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,99 @@
+'''
+Files loaded from the parse cache make the same flowchart as files which are parsed
+and a file which changed is parsed again
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests.util import JS_SCRIPTS, PY_SCRIPTS, copyScripts, generateDot, mapFiles
+
+from code2flowlib import engine
+from code2flowlib.discovery import findFiles
+from code2flowlib.parsecache import ParseCache
+from code2flowlib.profiler import Profile
+import code2flowlib.languages.javascript as javascript
+import code2flowlib.languages.python as python
+
+class TestParseCache(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def mapWithCache(self,implementation,filenames,**kwargs):
+		'''
+		Returns the DOT file and the profile counters of mapping with the cache
+		'''
+		profile = Profile()
+		engine.setProfile(profile)
+		try:
+			mapper, graph = mapFiles(implementation,filenames,cache=ParseCache(self.directory+'/cache'),**kwargs)
+		finally:
+			engine.setProfile(None)
+		return generateDot(graph), profile.counters
+
+	def assertCached(self,implementation,scripts,addition):
+		filenames = copyScripts(scripts,self.directory)
+		mapper, graph = mapFiles(implementation,filenames)
+		uncachedDot = generateDot(graph)
+
+		coldDot, counters = self.mapWithCache(implementation,filenames)
+		self.assertEqual(counters.get('cacheHits',0),0)
+		self.assertEqual(counters['cacheMisses'],len(filenames))
+		self.assertEqual(coldDot,uncachedDot)
+
+		for kwargs in ({},{'jobs':2}):
+			warmDot, counters = self.mapWithCache(implementation,filenames,**kwargs)
+			self.assertEqual(counters['cacheHits'],len(filenames))
+			self.assertEqual(counters.get('cacheMisses',0),0)
+			self.assertEqual(warmDot,uncachedDot)
+
+		#only the file which changed is parsed again
+		with open(filenames[0],'a') as outfile:
+			outfile.write(addition)
+		mapper, graph = mapFiles(implementation,filenames)
+		changedDot = generateDot(graph)
+		self.assertNotEqual(changedDot,uncachedDot)
+
+		dot, counters = self.mapWithCache(implementation,filenames)
+		self.assertEqual(counters['cacheHits'],len(filenames)-1)
+		self.assertEqual(counters['cacheMisses'],1)
+		self.assertEqual(dot,changedDot)
+
+	def testJavascript(self):
+		self.assertCached(javascript,JS_SCRIPTS,"\nfunction addedToTheCachedFile(){\n\taddedToTheCachedFile();\n}\n")
+
+	def testPython(self):
+		self.assertCached(python,PY_SCRIPTS,"\ndef addedToTheCachedFile():\n\taddedToTheCachedFile()\n")
+
+class TestCacheDirectory(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def testIgnored(self):
+		'''
+		A cache made inside the directory being mapped is ignored by git and is not mapped itself
+		'''
+		filenames = copyScripts(PY_SCRIPTS,self.directory)
+		cacheDirectory = os.path.join(self.directory,'cache')
+		mapFiles(python,filenames,cache=ParseCache(cacheDirectory))
+		self.assertEqual(len(os.listdir(cacheDirectory)),len(filenames)+1)
+		with open(os.path.join(cacheDirectory,'.gitignore')) as infile:
+			self.assertEqual(infile.read(),'*\n')
+		self.assertEqual(findFiles([self.directory],['*']),sorted(filenames))
+
+	def testEvictKeepsIgnoreFile(self):
+		filenames = copyScripts(PY_SCRIPTS,self.directory)
+		cacheDirectory = os.path.join(self.directory,'cache')
+		mapFiles(python,filenames,cache=ParseCache(cacheDirectory,maxBytes=0))
+		self.assertEqual(os.listdir(cacheDirectory),['.gitignore'])
+
+if __name__ == '__main__':
+	unittest.main()
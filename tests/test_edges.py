@@ -0,0 +1,40 @@
+'''
+Edges generated in sharded worker processes are exactly the edges generated in this process
+'''
+
+import unittest
+
+from code2flowlib import engine
+import code2flowlib.languages.javascript as javascript
+import code2flowlib.languages.python as python
+
+from tests.util import JS_SCRIPTS, PY_SCRIPTS, mapFiles, quiet
+
+class TestEdgeJobs(unittest.TestCase):
+	def assertSameEdges(self,implementation,filenames):
+		mapper, (groups,nodes,edges) = mapFiles(implementation,filenames)
+		allNodes = mapper._allFileNodes()
+		with quiet():
+			serialEdges = engine.generateEdges(allNodes,jobs=1)
+			for jobs in (2,4):
+				shardedEdges = engine.generateEdges(allNodes,jobs=jobs)
+				self.assertEqual(list(shardedEdges.callers),list(serialEdges.callers))
+				self.assertEqual(list(shardedEdges.callees),list(serialEdges.callees))
+
+		#map with jobs too. The file groups are parsed in workers so the nodes are only compared by position
+		mapper, (groups,nodes,edges) = mapFiles(implementation,filenames,jobs=4)
+		self.assertEqual(list(edges.callers),list(serialEdges.callers))
+		self.assertEqual(list(edges.callees),list(serialEdges.callees))
+
+	def testJavascript(self):
+		for filename in JS_SCRIPTS:
+			self.assertSameEdges(javascript,[filename])
+		self.assertSameEdges(javascript,JS_SCRIPTS)
+
+	def testPython(self):
+		for filename in PY_SCRIPTS:
+			self.assertSameEdges(python,[filename])
+		self.assertSameEdges(python,PY_SCRIPTS)
+
+if __name__ == '__main__':
+	unittest.main()
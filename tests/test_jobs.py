@@ -0,0 +1,31 @@
+'''
+Files parsed in worker processes make the same flowchart as files parsed in this process
+'''
+
+import unittest
+
+from tests.util import JS_SCRIPTS, PY_SCRIPTS, generateDot, mapFiles
+
+import code2flowlib.languages.javascript as javascript
+import code2flowlib.languages.python as python
+
+class TestParseJobs(unittest.TestCase):
+	def assertSameFlowchart(self,implementation,filenames):
+		mapper, serialGraph = mapFiles(implementation,filenames)
+		serialDot = generateDot(serialGraph)
+		for jobs in (2,4):
+			mapper, graph = mapFiles(implementation,filenames,jobs=jobs)
+			self.assertEqual(generateDot(graph),serialDot)
+
+		#with a timeout, even one job parses in a worker
+		mapper, graph = mapFiles(implementation,filenames,fileTimeout=60)
+		self.assertEqual(generateDot(graph),serialDot)
+
+	def testJavascript(self):
+		self.assertSameFlowchart(javascript,JS_SCRIPTS)
+
+	def testPython(self):
+		self.assertSameFlowchart(python,PY_SCRIPTS)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,34 @@
+'''
+Which javascript files are skipped as minified or generated
+'''
+
+import unittest
+
+from tests.util import JS_SCRIPTS
+
+from code2flowlib.languages.javascript import getMinifiedReason
+
+class TestGeneratedBanner(unittest.TestCase):
+	def testLeadingBanner(self):
+		self.assertTrue(getMinifiedReason("// This file is auto-generated. Do not edit\nfunction a(){}"))
+		self.assertTrue(getMinifiedReason("/*\n * @generated by a tool\n */\nvar a;"))
+		self.assertTrue(getMinifiedReason("#!/usr/bin/env node\n// DO NOT EDIT\nvar a;"))
+		self.assertTrue(getMinifiedReason("\xef\xbb\xbf\n/* license */\n// Automatically generated from a.proto\nvar a;"))
+
+	def testBannerLaterInTheFile(self):
+		self.assertIsNone(getMinifiedReason("'use strict';\n// do not edit this section by hand\nfunction a(){}"))
+		self.assertIsNone(getMinifiedReason("function a(){}\n/* see the auto-generated docs */"))
+		self.assertIsNone(getMinifiedReason("/* hand written */\nvar a; // do not edit"))
+		self.assertIsNone(getMinifiedReason("var a = '/* do not edit */';"))
+
+	def testMinified(self):
+		self.assertTrue(getMinifiedReason("function a(){return b()};"*100))
+		self.assertTrue(getMinifiedReason("function a(){}\n//# sourceMappingURL=a.js.map\n"))
+
+	def testTestscripts(self):
+		for filename in JS_SCRIPTS:
+			with open(filename) as fi:
+				self.assertIsNone(getMinifiedReason(fi.read()),filename)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,67 @@
+'''
+The ast parser makes the same flowchart as the regexes on the python testscripts
+and files which do not parse are mapped by the regexes instead
+'''
+
+import os
+import shutil
+import StringIO
+import sys
+import tempfile
+import unittest
+
+from tests.util import PY_SCRIPTS, copyScripts, generateDot, mapFiles
+
+import code2flowlib.languages.python as python
+import code2flowlib.languages.pythonast as pythonast
+
+#Only python 3 parses the keyword only argument
+PYTHON3_SCRIPT = '''
+def a(*, b=1):
+	return c(b)
+
+def c(d):
+	print(d)
+
+class E(object):
+	def f(self):
+		a()
+
+a()
+'''
+
+class TestPythonAst(unittest.TestCase):
+	def assertSameFlowchart(self,filenames,**kwargs):
+		mapper, regexGraph = mapFiles(python,filenames,**kwargs)
+		mapper, astGraph = mapFiles(pythonast,filenames,**kwargs)
+		self.assertEqual(generateDot(astGraph),generateDot(regexGraph))
+
+	def testTestscripts(self):
+		for filename in PY_SCRIPTS:
+			self.assertSameFlowchart([filename])
+		self.assertSameFlowchart(PY_SCRIPTS)
+		self.assertSameFlowchart(PY_SCRIPTS,jobs=2)
+
+	def testFallback(self):
+		directory = tempfile.mkdtemp()
+		try:
+			filenames = copyScripts(PY_SCRIPTS,directory)
+			filenames.append(os.path.join(directory,'python3.py'))
+			with open(filenames[-1],'w') as outfile:
+				outfile.write(PYTHON3_SCRIPT)
+			self.assertSameFlowchart(filenames)
+			self.assertSameFlowchart(filenames,jobs=2)
+
+			stdout = sys.stdout
+			sys.stdout = StringIO.StringIO()
+			try:
+				pythonast.Mapper(pythonast,filenames[-1:]).map()
+				output = sys.stdout.getvalue()
+			finally:
+				sys.stdout = stdout
+			self.assertIn('Could not parse %s'%os.path.splitext(filenames[-1])[0],output)
+		finally:
+			shutil.rmtree(directory)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,69 @@
+'''
+Remapping the files which changed gives the same flowchart as mapping every file again
+The files can be in another order. map goes through them in the order of a dict and remap puts new files last
+'''
+
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from tests.util import JS_SCRIPTS, PY_SCRIPTS, copyScripts, describeGraph, mapFiles, quiet
+
+import code2flowlib.languages.javascript as javascript
+import code2flowlib.languages.python as python
+
+class TestRemap(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def assertSameAsMap(self,implementation,mapper,filenames,changed):
+		with quiet():
+			graph = mapper.remap(changed)
+		mapper, freshGraph = mapFiles(implementation,[filename for filename in filenames if os.path.isfile(filename)])
+		self.assertEqual(describeGraph(graph),describeGraph(freshGraph))
+
+	def assertRemaps(self,implementation,scripts,definitionPattern,addition,call):
+		'''
+		The frame file only calls addedLater, which addition defines in the second file. Until then, the python module frame is trimmed as extraneous
+		'''
+		filenames = copyScripts(scripts,self.directory)
+		filenames.append(os.path.join(self.directory,'frame'+os.path.splitext(filenames[0])[1]))
+		with open(filenames[-1],'w') as outfile:
+			outfile.write(call%{'module':os.path.splitext(os.path.basename(filenames[1]))[0]})
+		mapper, graph = mapFiles(implementation,filenames)
+
+		#calls into the renamed function from the other files no longer link
+		with open(filenames[0]) as infile:
+			fileString = infile.read()
+		with open(filenames[0],'w') as outfile:
+			outfile.write(definitionPattern.sub(r'\1renamed\2',fileString,count=1))
+		self.assertSameAsMap(implementation,mapper,filenames,[filenames[0]])
+
+		#a function which calls functions in the others and is called by the frame file
+		with open(filenames[1],'a') as outfile:
+			outfile.write(addition)
+		self.assertSameAsMap(implementation,mapper,filenames,[filenames[1]])
+
+		#a file which was deleted and a new file at once
+		os.remove(filenames[2])
+		newFilename = os.path.join(self.directory,'new'+os.path.splitext(filenames[0])[1])
+		shutil.copy(scripts[2],newFilename)
+		filenames.append(newFilename)
+		self.assertSameAsMap(implementation,mapper,filenames,[filenames[2],newFilename])
+
+		#nothing changed
+		self.assertSameAsMap(implementation,mapper,filenames,filenames)
+
+	def testJavascript(self):
+		self.assertRemaps(javascript,JS_SCRIPTS,re.compile(r"(\bfunction\s+)(\w+)"),"\nfunction addedLater(){\n\treturn jQuery.extend(a,b);\n}\n","addedLater();\n")
+
+	def testPython(self):
+		self.assertRemaps(python,PY_SCRIPTS,re.compile(r"(\bdef\s+)(\w+)"),"\ndef addedLater():\n\treturn urlopen(a)\n","from %(module)s import addedLater\naddedLater()\n")
+
+if __name__ == '__main__':
+	unittest.main()
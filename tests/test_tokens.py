@@ -0,0 +1,53 @@
+'''
+The javascript token stream is the same whether it is lexed with numpy or with the token regex
+'''
+
+import unittest
+
+from tests.util import JS_SCRIPTS, quiet
+
+from code2flowlib import engine
+import code2flowlib.languages.javascript as javascript
+
+#Everything the lexers index
+INDEXES = ('starts','ends','parens','openBrackets','closeBrackets','callPositions','callNames','chainStarts','parenPositions','returnPositions')
+
+@unittest.skipUnless(javascript.numpy,'numpy is not installed')
+class TestTokenStream(unittest.TestCase):
+	def assertSameTokens(self,fileString):
+		withNumpy = javascript.TokenStream(fileString)
+		withNumpy._lexWithNumpy()
+		withRegex = javascript.TokenStream(fileString)
+		withRegex._lexWithRegex()
+
+		for index in INDEXES:
+			self.assertEqual(list(getattr(withNumpy,index)),list(getattr(withRegex,index)),index)
+		self.assertEqual([withNumpy.getToken(i) for i in range(len(withNumpy.starts))],[match.group() for match in javascript.tokenPattern.finditer(fileString)])
+
+		#the brackets of the regex lexer are matched without numpy
+		closePositions = engine._matchBracketsWithStack(withRegex.openBrackets,withRegex.closeBrackets)
+		for openPosition in withRegex.openBrackets:
+			self.assertEqual(withNumpy.getClosePosition(openPosition),closePositions.get(openPosition,-1))
+
+	def testTestscripts(self):
+		for filename in JS_SCRIPTS:
+			with open(filename) as fi:
+				fileString = fi.read()
+			with quiet():
+				source = javascript.SourceCode(fileString)
+			self.assertSameTokens(source.fileString)
+
+	def testUncleanedTestscripts(self):
+		'''
+		Strings and comments are full of characters the cleaned source does not have
+		'''
+		for filename in JS_SCRIPTS:
+			with open(filename) as fi:
+				self.assertSameTokens(fi.read())
+
+	def testEdges(self):
+		for fileString in ('','a','(',' \t\n','a.b.c(d)','return','returns(1)','}{','a\xff(b)\x00{'):
+			self.assertSameTokens(fileString)
+
+if __name__ == '__main__':
+	unittest.main()
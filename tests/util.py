@@ -0,0 +1,83 @@
+'''
+What the tests share. Every test maps the scripts in testscripts
+
+Run the tests from the top of the repository with:
+	python -m unittest discover tests
+'''
+
+import __builtin__
+import glob
+import os
+import re
+import shutil
+import sys
+
+#code2flow sets this for every module before anything is mapped
+__builtin__.DEBUG = False
+
+import code2flowlib.dotgenerator as dotgenerator
+
+TESTSCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),'testscripts')
+JS_SCRIPTS = sorted(glob.glob(os.path.join(TESTSCRIPTS,'*.js')))
+PY_SCRIPTS = sorted(filename for filename in glob.glob(os.path.join(TESTSCRIPTS,'*.py')) if not filename.endswith('__init__.py'))
+
+class quiet(object):
+	'''
+	The mapper talks a lot. Throw away everything printed in a with block
+	'''
+	def __enter__(self):
+		self.stdout = sys.stdout
+		sys.stdout = open(os.devnull,'w')
+
+	def __exit__(self,excType,excValue,traceback):
+		sys.stdout.close()
+		sys.stdout = self.stdout
+
+def mapFiles(implementation,filenames,**kwargs):
+	'''
+	Map the files like code2flow does. Returns the mapper and its (groups,nodes,edges)
+	'''
+	with quiet():
+		mapper = implementation.Mapper(implementation,filenames,**kwargs)
+		groups, nodes, edges = mapper.map()
+	return mapper, (groups,nodes,edges)
+
+def copyScripts(filenames,directory):
+	'''
+	Copy the scripts into the directory so that the tests can change them. Returns the paths of the copies
+	'''
+	copies = []
+	for filename in filenames:
+		copies.append(os.path.join(directory,os.path.basename(filename)))
+		shutil.copy(filename,copies[-1])
+	return copies
+
+#The UIDs of nodes and groups. They count up for the whole process so two runs never share them
+uidPattern = re.compile(r"\b(?:node|cluster)\w*?\d+\b")
+
+def generateDot(graph):
+	'''
+	The DOT file of (groups,nodes,edges) with every UID renamed in the order it first appears
+	Two graphs with the same DOT file here are the same graph
+	'''
+	groups, nodes, edges = graph
+	uids = {}
+	def renameUID(match):
+		return uids.setdefault(match.group(0),'uid%d'%len(uids))
+	return uidPattern.sub(renameUID,dotgenerator.generateDotFile(nodes,edges,groups))
+
+def describeGraph(graph):
+	'''
+	(groups,nodes,edges) as sorted lists which do not depend on the order the files were mapped in
+	A node is its file and its DOT line without the UID. A group is its name, its nodes and its subgroups
+	'''
+	groups, nodes, edges = graph
+	def describeNode(node):
+		return node._getFileName(), uidPattern.sub('',str(node))
+	def describeGroup(group):
+		return group.name, [describeNode(node) for node in group.nodes], [describeGroup(subgroup) for subgroup in group.subgroups]
+	return (
+		sorted(describeGroup(group) for group in groups)
+		,sorted(describeNode(node) for node in nodes)
+		,sorted((describeNode(node0),describeNode(node1),node1.returns) for node0,node1 in edges.pairs())
+		)